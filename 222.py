@@ -1,18 +1,66 @@
+import copy
 import csv
+import html
+import io
+import json
+import os
+import queue
+import random
 import re
-from itertools import islice
-from typing import List, Tuple
+import sys
+import threading
+from collections import deque
+from itertools import compress, islice
+from operator import and_, itemgetter
+from typing import Callable, Iterable, Iterator, List, Set, Tuple
 from datetime import datetime
-import matplotlib.pyplot as plt
-import numpy as np
-from prettytable import PrettyTable, ALL
-import doctest
+from decompress import detect_compression, open_text
+from inverted_index import InvertedIndex, match_query, parse_query, tokenize
+from profiler import profiler
+from sketches import FrequentItemsSketch, KLLSketch
+# matplotlib, numpy, prettytable, hashlib и concurrent.futures импортируются внутри функций, которым они нужны: так запуск в режиме таблицы не ждет импорта matplotlib
 
-title_names = {'name': 'Название', 'description': 'Описание', 'key_skills': 'Навыки', 'experience_id': 'Опыт работы', 'premium': 'Премиум-вакансия', 'employer_name': 'Компания', 'salary': 'Оклад', 'salary_from': 'Нижняя граница вилки оклада', 'salary_to': 'Верхняя граница вилки оклада', 'salary_gross': 'Оклад указан до вычета налогов', 'salary_currency': 'Идентификатор валюты оклада', 'area_name': 'Название региона', 'published_at': 'Дата публикации вакансии'}
+title_names = {'name': 'Название', 'description': 'Описание', 'key_skills': 'Навыки', 'experience_id': 'Опыт работы', 'premium': 'Премиум-вакансия', 'employer_name': 'Компания', 'salary': 'Оклад', 'salary_from': 'Нижняя граница вилки оклада', 'salary_to': 'Верхняя граница вилки оклада', 'salary_gross': 'Оклад указан до вычета налогов', 'salary_currency': 'Идентификатор валюты оклада', 'area_name': 'Название региона', 'published_at': 'Дата публикации вакансии', 'skills': 'Навык'}
 table_fields = {'name': 'Название', 'description': 'Описание', 'key_skills': 'Навыки', 'experience_id': 'Опыт работы', 'premium': 'Премиум-вакансия', 'employer_name': 'Компания', 'salary': 'Оклад', 'area_name': 'Название региона', 'published_at': 'Дата публикации вакансии'}
 experience = {'noExperience': 'Нет опыта', 'between1And3': 'От 1 года до 3 лет', 'between3And6': 'От 3 до 6 лет', 'moreThan6': 'Более 6 лет'}
 currency = {'AZN': 'Манаты', 'BYR': 'Белорусские рубли', 'EUR': 'Евро', 'GEL': 'Грузинский лари', 'KGS': 'Киргизский сом', 'KZT': 'Тенге', 'RUR': 'Рубли', 'UAH': 'Гривны', 'USD': 'Доллары', 'UZS': 'Узбекский сум'}
 currency_to_rub = {'AZN': 35.68, 'BYR': 23.91, 'EUR': 59.9, 'GEL': 21.74, 'KGS': 0.76, 'KZT': 0.13, 'RUR': 1, 'UAH': 1.64, 'USD': 60.66, 'UZS': 0.0055}
+# состояние статистики хранится рядом с csv-файлом; при изменении формата состояния нужно увеличить state_version
+state_suffix = '.stats.json'
+state_version = 2
+state_fingerprint_size = 65536
+# индекс навыков хранится рядом с csv-файлом; при изменении разбиения на токены нужно увеличить skill_index_version
+skill_index_suffix = '.index.json'
+skill_index_version = 1
+# конвейер чтения: строк в пачке и пачек, ожидающих разбора
+pipeline_batch_size = 10000
+pipeline_queue_size = 8
+skill_separator = re.compile(r'\s*[\n,]\s*')
+# print_vacancies сортирует в памяти файлы до sort_memory_limit байт, большие — внешней сортировкой;
+# отсортированные части сохраняются во временные файлы блоками по sort_block_size строк
+sort_memory_limit = 256 * 1024 * 1024
+sort_block_size = 1000
+# html-теги и возвраты каретки, удаляемые clean_html за один проход
+html_pattern = re.compile(r'<[^>]+>|\r')
+# режим --sample оценивает статистику по sample_size строкам: несжатые файлы больше sample_scan_limit байт
+# читаются окнами по sample_window байт со случайных смещений, остальные — за один проход с резервуарной выборкой;
+# начало записи после смещения принимается, если с него читаются sample_align_records записей с нужным числом полей
+sample_size = 10000
+sample_scan_limit = 16 * 1024 * 1024
+sample_window = 4096
+sample_align_records = 3
+# в режиме --cache словари статистики кэшируются в папке statistics_cache_dir; при превышении
+# statistics_cache_limit байт удаляются давно не использованные записи
+statistics_cache_dir = '.statistics_cache'
+statistics_cache_limit = 64 * 1024 * 1024
+# модули рядом со скриптом, от которых зависит результат статистики: их хеш входит в версию кода ключа кэша
+statistics_modules = ('decompress.py', 'inverted_index.py', 'sketches.py')
+# множитель стандартной ошибки для 95% доверительного интервала
+confidence_z = 1.96
+# правила проверки строк csv-файла: обязательные поля должны быть заполнены, из границ оклада — хотя бы одна;
+# остальные поля (описание, навыки, опыт работы, компания и т.д.) необязательны
+required_fields = ('name', 'area_name', 'published_at', 'salary_currency')
+salary_fields = ('salary_from', 'salary_to')
 
 class Vacancy:
 	"""Класс для представления вакансии.
@@ -35,7 +83,50 @@ class Vacancy:
 		self.name: str = name
 		self.area_name: str = area_name
 		self.salary: Salary = salary
-		self.published_at: datetime = datetime.strptime(published_at.replace('T', ' '), '%Y-%m-%d %H:%M:%S+%f')
+		self.published_at: datetime = parse_published_at(published_at)
+
+class LazyVacancy:
+	"""Вакансия, которая хранит строку csv-файла и разбирает поле только при первом обращении к нему.
+	Разобранное значение запоминается в атрибуте, поэтому повторные обращения ничего не стоят.
+	Поля, которых нет в файле, отсутствуют так же, как у Vacancy
+
+	Attributes:
+		columns (dict): Номера колонок csv-файла по заголовкам
+		row (List[str]): Значения строки csv-файла
+	"""
+	def __init__(self, columns: dict, row: List[str]):
+		"""Конструктор класса
+
+		Args:
+			columns (dict): Номера колонок csv-файла по заголовкам
+			row (List[str]): Значения строки csv-файла
+		"""
+		self.columns = columns
+		self.row = row
+
+	def __getattr__(self, key: str):
+		"""Разбирает поле при первом обращении (вызывается, только если атрибута еще нет)
+
+		Args:
+			key (str): Название поля
+
+		Returns:
+			Any: Значение поля
+
+		>>> vacancy = LazyVacancy({'name': 0, 'published_at': 1, 'salary_from': 2, 'salary_to': 3, 'salary_currency': 4}, ['<b>Аналитик</b>', '2022-12-01T18:01:01+0300', '10', '30', 'RUR'])
+		>>> vacancy.name, vacancy.published_at.year, str(vacancy.salary), sorted(vacancy.__dict__)
+		('Аналитик', 2022, '10 - 30 (RUR)', ['columns', 'name', 'published_at', 'row', 'salary'])
+		"""
+		if key == 'salary':
+			value = Salary(**{name: clean_html(self.row[number]) for name, number in self.columns.items() if 'salary' in name})
+		elif key in self.columns and (key in table_fields or key == 'published_at'):
+			value = self.row[self.columns[key]]
+			value = parse_published_at(clean_html(value)) if key == 'published_at' else clean_html(value)
+		else:
+			raise AttributeError(key)
+
+		self.__dict__[key] = value
+		return value
 
 class Salary:
 	"""Класс для представления вакансии.
@@ -46,15 +137,19 @@ class Salary:
 		salary_currency (str): Валюта оклада
 	"""
 	def __init__(self, salary_from, salary_to, salary_currency, **kwargs):
-		"""Конструктор класса. Выполняет преобразование float в SalaryFloatItem
+		"""Конструктор класса. Выполняет преобразование float в SalaryFloatItem.
+		Если одна из границ не указана (пустая строка), она считается равной другой
 
 		Args:
 			salary_from (int or float): Нижняя граница оклада
 			salary_to (int or float): Верхняя граница оклада
 			salary_currency (str): Валюта оклада
+
+		>>> str(Salary('', '30', 'RUR'))
+		'30 - 30 (RUR)'
 		"""
-		self.salary_from: SalaryFloatItem = SalaryFloatItem(salary_from)
-		self.salary_to: SalaryFloatItem = SalaryFloatItem(salary_to)
+		self.salary_from: SalaryFloatItem = SalaryFloatItem(salary_to if salary_from == '' else salary_from)
+		self.salary_to: SalaryFloatItem = SalaryFloatItem(salary_from if salary_to == '' else salary_to)
 		self.salary_currency: str = salary_currency
 
 		if salary_currency != 'RUR':
@@ -98,6 +193,53 @@ class SalaryFloatItem(float):
 		return f'{int(self):,}'.replace(',', ' ')
 
 
+class CategoryTable:
+	"""Класс таблицы кодирования значений категориального поля (город, валюта, опыт работы, компания).
+	Одинаковые значения хранятся одной строкой и получают один целочисленный код в порядке первого появления.
+
+	Attributes:
+		codes (dict): Код для каждого значения
+		values (List[str]): Значения в порядке кодов
+	"""
+	def __init__(self):
+		"""Конструктор класса
+		"""
+		self.codes = {}
+		self.values: List[str] = []
+
+	def encode(self, value: str) -> int:
+		"""Возвращает код значения, добавляя значение в таблицу при первом появлении
+
+		Args:
+			value (str): Значение поля
+
+		Returns:
+			int: Код значения
+
+		>>> table = CategoryTable()
+		>>> table.encode('Москва'), table.encode('Казань'), table.encode('Москва'), table.values
+		(0, 1, 0, ['Москва', 'Казань'])
+		"""
+		code = self.codes.get(value)
+		if code is None:
+			code = self.codes[value] = len(self.values)
+			self.values.append(value)
+		return code
+
+	def __len__(self):
+		"""Определяет количество различных значений
+
+		Returns:
+			int: Количество значений в таблице
+		"""
+		return len(self.values)
+
+# общие таблицы кодирования категориальных полей, заполняются csv_filer
+categories = {key: CategoryTable() for key in ('area_name', 'salary_currency', 'experience_id', 'employer_name')}
+# ключи, по которым aggregate может группировать вакансии
+group_keys = ('year', 'year_month', 'area_name', 'salary_currency', 'experience_id')
+
+
 class Report:
 	"""Класс для вывода визуальной статистики.
 
@@ -109,8 +251,9 @@ class Report:
 		vacancies_prof (dict): Статистика вакансий для prof_name
 		cities_salaries (dict): Динамика зарплат в городах
 		cities_vacancies (dict): Доля вакансий в городах
+		quantiles (dict): Квантили зарплат (10%, медиана, 90%) по годам, по годам для prof_name и по городам
 	"""
-	def __init__(self, prof_name, salaries, vacancies, salaries_prof, vacancies_prof, cities_salaries, cities_vacancies):
+	def __init__(self, prof_name, salaries, vacancies, salaries_prof, vacancies_prof, cities_salaries, cities_vacancies, quantiles=None):
 		"""Конструктор класса
 		
 		Args:
@@ -121,6 +264,7 @@ class Report:
 			vacancies_prof (dict): Статистика вакансий для prof_name
 			cities_salaries (dict): Динамика зарплат в городах
 			cities_vacancies (dict): Доля вакансий в городах
+			quantiles (dict): Квантили зарплат с ключами 'salaries', 'salaries_prof' и 'cities_salaries' или None
 		"""
 		self.prof_name = prof_name
 		self.salaries = salaries
@@ -129,6 +273,7 @@ class Report:
 		self.vacancies_prof = vacancies_prof
 		self.cities_salaries = cities_salaries
 		self.cities_vacancies = cities_vacancies
+		self.quantiles = quantiles
 
 	def __get_min_max(self, dict_):
 		"""Приватный метод для получения минимального и максимального значений ключей словаря
@@ -138,18 +283,39 @@ class Report:
 		"""
 		return min(dict_.keys()), max(dict_.keys())
 
+	def __get_errors(self, quantiles: dict) -> Tuple[list, list]:
+		"""Приватный метод для получения медиан и отклонений 10% и 90% квантилей от медианы
+
+		Returns:
+			Tuple[list]: Первое значение — медианы, Второе — нижние и верхние отклонения
+		"""
+		medians = [median for _, median, _ in quantiles.values()]
+		return medians, [[median - low for low, median, _ in quantiles.values()], [high - median for _, median, high in quantiles.values()]]
+
+	@profiler.timer('plotting')
 	def generate_image(self):
 		"""Метод генерации изображения, представляющего статистику
 		"""
+		import matplotlib.pyplot as plt
+		import numpy as np
+
 		salaries_start_year, salaries_last_year = self.__get_min_max(self.salaries)
 		prof_salaries_start_year, prof_salaries_last_year = self.__get_min_max(self.salaries_prof)
 
 		plt.figure(figsize=(12, 7))
 
 		plt.subplot(2, 2, 1)
-		plt.bar(np.arange(salaries_start_year, salaries_last_year+1) - 0.2, list(self.salaries.values()), width = 0.4)
-		plt.bar(np.arange(prof_salaries_start_year, prof_salaries_last_year+1) + 0.2, list(self.salaries_prof.values()), width = 0.4)
-		plt.legend(['средняя з/п', f'з/п {self.prof_name}'])
+		legend = [
+			plt.bar(np.arange(salaries_start_year, salaries_last_year+1) - 0.2, list(self.salaries.values()), width = 0.4),
+			plt.bar(np.arange(prof_salaries_start_year, prof_salaries_last_year+1) + 0.2, list(self.salaries_prof.values()), width = 0.4)
+		]
+		legend_names = ['средняя з/п', f'з/п {self.prof_name}']
+		if self.quantiles:
+			for x, key, name in ((np.arange(salaries_start_year, salaries_last_year+1) - 0.2, 'salaries', 'медиана з/п (10%–90%)'), (np.arange(prof_salaries_start_year, prof_salaries_last_year+1) + 0.2, 'salaries_prof', f'медиана з/п {self.prof_name} (10%–90%)')):
+				medians, errors = self.__get_errors(self.quantiles[key])
+				legend.append(plt.errorbar(x, medians, yerr=errors, fmt='o', markersize=3, capsize=2))
+				legend_names.append(name)
+		plt.legend(legend, legend_names)
 		plt.grid(axis='y')
 		plt.title('Уровень зарплат по годам')
 		plt.xticks(rotation=90)
@@ -166,6 +332,9 @@ class Report:
 
 		plt.subplot(2, 2, 3)
 		plt.barh(list(self.cities_salaries.keys()), list(self.cities_salaries.values()))
+		if self.quantiles:
+			medians, errors = self.__get_errors(self.quantiles['cities_salaries'])
+			plt.errorbar(medians, list(self.quantiles['cities_salaries'].keys()), xerr=errors, fmt='o', color='black', markersize=3, capsize=2)
 		plt.grid(axis='x')
 		plt.gca().invert_yaxis()
 		plt.title('Уровень зарплат по городам')
@@ -180,8 +349,35 @@ class Report:
 		plt.savefig('graph.png')
 		plt.show()
 
+	@staticmethod
+	@profiler.timer('plotting')
+	def generate_skills_image(skills: dict, skills_professions: dict):
+		"""Метод генерации изображения самых востребованных навыков
+
+		Args:
+			skills (dict): Количество вакансий с навыком по всем годам
+			skills_professions (dict): Количество вакансий с навыком для каждой профессии
+		"""
+		import matplotlib.pyplot as plt
+
+		plots = {'Востребованность навыков': skills, **{f'Навыки {prof_name}': data for prof_name, data in skills_professions.items()}}
+		plt.figure(figsize=(6 * len(plots), 7))
+
+		for number, (title, data) in enumerate(plots.items(), 1):
+			plt.subplot(1, len(plots), number)
+			plt.barh(list(data.keys()), list(data.values()))
+			plt.grid(axis='x')
+			plt.gca().invert_yaxis()
+			plt.title(title)
+
+		plt.subplots_adjust(wspace=.6)
+		plt.savefig('skills.png')
+		plt.show()
+
+@profiler.timer('parsing')
 def csv_reader(file_name: str) -> Tuple[List[str], List[str]]:
-	"""Читает csv-файл и возвращает его заголовки и значения строк
+	"""Читает csv-файл и возвращает его заголовки и значения строк.
+	Файлы, сжатые gzip, bz2, xz или zstd, распаковываются на лету в отдельном потоке
 
 	Args:
 		file_name (str): Название csv-файла
@@ -189,18 +385,179 @@ def csv_reader(file_name: str) -> Tuple[List[str], List[str]]:
 	Returns:
 		Tuple[List[str], List[str]]: Первый индекс — заголовки, Второй — значения строк
 	"""
-	with open(file_name, 'r', encoding='utf-8', newline='') as file:
-		titles = re.sub('\n|\r|\ufeff', '', file.readline()).split(',')
-		data = [elem for elem in list(csv.reader(file)) if all(map(lambda x: len(x) > 0, elem)) and len(elem) == len(titles)]
+	with open_text(file_name) as file:
+		header = file.readline()
+		titles = re.sub('\n|\r|\ufeff', '', header).split(',')
+		data = filter_rows(csv.reader(file), titles)
 	   
-		file.seek(0)
-		if file.read() == '':
+		if header == '':
 			return 'Пустой файл'
 		if len(data) == 0:
 			return 'Нет данных'
 
 	return titles, data
 
+def filter_rows(rows, titles: List[str]) -> List[List[str]]:
+	"""Оставляет только корректные строки csv-файла (см. validate_rows).
+	Количество отброшенных строк по каждой причине добавляется в счетчики профилировщика rows_dropped_<причина>
+
+	Args:
+		rows (Iterable[List[str]]): Значения строк csv-файла
+		titles (List[str]): Заголовки csv-файла
+
+	Returns:
+		List[List[str]]: Значения корректных строк
+	"""
+	rows = list(rows)
+	data, rejected = validate_rows(rows, titles)
+	profiler.count('rows_read', len(rows))
+	profiler.count('rows_dropped_invalid', len(rows) - len(data))
+	for reason, count in rejected.items():
+		profiler.count(f'rows_dropped_{reason}', count)
+	return data
+
+def validate_rows(rows: List[List[str]], titles: List[str]) -> Tuple[List[List[str]], dict]:
+	"""Проверяет пачку строк csv-файла по колонкам: число значений должно совпадать с числом заголовков,
+	поля required_fields должны быть заполнены, а из salary_fields — хотя бы одно. Каждая проверка выполняется
+	для всей колонки сразу (map на уровне C), без разбора строк по одной
+
+	Args:
+		rows (List[List[str]]): Значения строк csv-файла
+		titles (List[str]): Заголовки csv-файла
+
+	Returns:
+		Tuple[List[List[str]], dict]: Значения корректных строк и количество отброшенных строк по первой нарушенной проверке
+		('field_count', 'empty_<поле>' или 'empty_salary')
+
+	>>> titles = ['name', 'description', 'salary_from', 'salary_to', 'salary_currency', 'area_name', 'published_at']
+	>>> rows = [['A', '', '10', '', 'RUR', 'Москва', '2022'], ['B', 'x', '', '', 'RUR', 'Москва', '2022'], ['C', '10'], ['', 'x', '1', '2', '', 'Москва', '2022']]
+	>>> data, rejected = validate_rows(rows, titles)
+	>>> [row[0] for row in data], rejected
+	(['A'], {'field_count': 1, 'empty_salary': 1, 'empty_name': 1})
+	"""
+	rejected = {}
+	valid = list(map(len(titles).__eq__, map(len, rows)))
+	if valid.count(False):
+		rejected['field_count'] = valid.count(False)
+		rows = list(compress(rows, valid))
+	if not rows:
+		return rows, rejected
+
+	# для каждой проверки — функция, извлекающая из строки проверяемые значения, и функция проверки их заполненности
+	columns = {title: number for number, title in enumerate(titles)}
+	checks = [(f'empty_{field}', itemgetter(columns[field]), bool) for field in required_fields if field in columns]
+	salaries = [columns[field] for field in salary_fields if field in columns]
+	if salaries:
+		checks.insert(0, ('empty_salary', itemgetter(*salaries), any if len(salaries) > 1 else bool))
+	if not checks:
+		return rows, rejected
+
+	valid, kept = None, len(rows)
+	for reason, getter, check in checks:
+		filled = list(map(check, map(getter, rows)))
+		if all(filled):
+			continue
+		valid = filled if valid is None else list(map(and_, valid, filled))
+		if valid.count(True) < kept:
+			rejected[reason] = kept - valid.count(True)
+			kept = valid.count(True)
+	return rows if valid is None else list(compress(rows, valid)), rejected
+
+@profiler.timer('parsing')
+def find_record_end(data: bytes) -> int:
+	"""Находит конец последней записи csv, завершенной переводом строки: позицию после последнего перевода строки
+	вне кавычек. Перевод строки внутри значения в кавычках запись не завершает
+
+	Args:
+		data (bytes): Байты csv-файла
+
+	Returns:
+		int: Позиция конца записи (0, если завершенных записей нет)
+
+	>>> find_record_end(b'a,"x\\ny",1\\nb,"z\\n')
+	10
+	>>> find_record_end(b'a,1\\nb,2'), find_record_end(b'a,"1\\n')
+	(4, 0)
+	"""
+	quotes, end = data.count(b'"'), len(data)
+	while True:
+		position = data.rfind(b'\n', 0, end)
+		if position < 0:
+			return 0
+		# кавычки до перевода строки = все кавычки минус кавычки после него; четное число — перевод строки вне кавычек
+		quotes -= data.count(b'"', position + 1, end)
+		if quotes % 2 == 0:
+			return position + 1
+		end = position
+
+def csv_tail_reader(file_name: str, offset: int) -> Tuple[List[str], List[List[str]], List[List[str]], int]:
+	"""Читает строки csv-файла, дописанные после байтового смещения offset.
+	Смещение сдвигается только до конца последней записи, завершенной переводом строки вне кавычек (find_record_end),
+	и декодируются только байты до него, поэтому недописанная запись или символ utf-8 на конце файла не теряются.
+	Последняя запись без перевода строки с закрытыми кавычками возвращается отдельно: ее нужно учесть в результате,
+	но не в сохраненном состоянии, так как файл может дописываться и она будет прочитана заново
+
+	Args:
+		file_name (str): Название csv-файла
+		offset (int): Смещение, до которого файл уже прочитан (0 — файл еще не читался)
+
+	Returns:
+		Tuple[List[str], List[List[str]], List[List[str]], int]: Заголовки, значения новых завершенных строк,
+			значения последней строки без перевода строки и смещение, до которого файл прочитан
+	"""
+	with open(file_name, 'rb') as file:
+		header = file.readline()
+		titles = re.sub('\n|\r|\ufeff', '', header.decode('utf-8')).split(',')
+		offset = max(offset, len(header))
+		file.seek(offset)
+		tail = file.read()
+
+	end = find_record_end(tail)
+	data = filter_rows(csv.reader(io.StringIO(tail[:end].decode('utf-8'), newline='')), titles)
+	rest, trailing = tail[end:], []
+	if rest.strip() and rest.count(b'"') % 2 == 0:
+		try:
+			trailing = filter_rows(csv.reader(io.StringIO(rest.decode('utf-8'), newline='')), titles)
+		except UnicodeDecodeError:
+			# запись обрывается внутри символа utf-8 — она еще дописывается
+			pass
+	return titles, data, trailing, offset + end
+
+def clean_html(value: str) -> str:
+	"""Приводит значение в читабельный вид: удаляет html-теги и возвраты каретки, декодирует html-сущности
+	и нормализует пробелы. Значения без '<', '&', '\\r' и '\\n' обрабатываются без регулярных выражений
+
+	Args:
+		value (str): Значение
+
+	Returns:
+		str: Очищенное значение
+
+	>>> clean_html('  Python   разработчик ')
+	'Python разработчик'
+	>>> clean_html('<p>Опыт&nbsp;работы  &lt;3 лет&gt;</p>\\r\\n<ul><li> Python </li></ul>')
+	'Опыт работы  <3 лет>\\nPython'
+	"""
+	if '<' not in value and '&' not in value and '\r' not in value and '\n' not in value:
+		return ' '.join(value.split())
+
+	value = html_pattern.sub('', value)
+	# сущности декодируются после удаления тегов, чтобы &lt;b&gt; остался текстом
+	if '&' in value:
+		value = html.unescape(value).replace('\xa0', ' ')
+	return '\n'.join(line.strip() for line in value.split('\n')) if '\n' in value else ' '.join(value.split())
+
+def parse_published_at(value: str) -> datetime:
+	"""Преобразует дату публикации вакансии к типу datetime
+
+	Args:
+		value (str): Дата публикации вакансии
+
+	Returns:
+		datetime: Дата публикации вакансии
+	"""
+	return datetime.strptime(value.replace('T', ' '), '%Y-%m-%d %H:%M:%S+%f')
+
 def format_value(dict_object: dict, key: str, value: str) -> None:
 	"""Форматирует значение и устанавливает его как значение определенного ключа для словаря
 
@@ -209,13 +566,22 @@ def format_value(dict_object: dict, key: str, value: str) -> None:
 		key (str): Ключ для словаря
 		value (str): Значение для словаря, которое нужно привести в читабельный вид
 	"""
-	value = re.sub('\r', '', value)
-	value = re.sub(r'<[^>]+>', '', value, flags=re.S)
-	value = '\n'.join(map(lambda i: i.strip(), value.split('\n'))) if '\n' in value else ' '.join(value.strip().split())    
-	dict_object[key] = value
+	dict_object[key] = clean_html(value)
+
+def encode_categories(dict_object: dict) -> None:
+	"""Заменяет значения категориальных полей словаря общими строками из таблиц кодирования categories
+
+	Args:
+		dict_object (dict): Словарь значений полей вакансии или оклада
+	"""
+	for key, table in categories.items():
+		if isinstance(dict_object.get(key), str):
+			dict_object[key] = table.values[table.encode(dict_object[key])]
 
+@profiler.timer('formatting')
 def csv_filer(titles: List[str], data: List[str]) -> List[Vacancy]:
-	"""Формирует список вакансий из прочитанного csv-файла
+	"""Формирует список вакансий из прочитанного csv-файла. Категориальные поля кодируются общими таблицами categories:
+	значения хранятся одной строкой на все вакансии, а коды хранятся не в вакансиях, а в колонках build_columns
 
 	Args:
 		titles (list): Заголовки csv-файла
@@ -230,6 +596,9 @@ def csv_filer(titles: List[str], data: List[str]) -> List[Vacancy]:
 	1
 	>>> str(csv_filer(['name', 'area_name', 'published_at', 'salary_from', 'salary_to', 'salary_currency'], [['Name', 'Area Name', '2022-12-01 18:01:01+120863', '12', '24', 'RUR']])[0].salary)
 	'12 - 24 (RUR)'
+	>>> vacancies = csv_filer(['name', 'area_name', 'published_at', 'salary_from', 'salary_to', 'salary_currency'], [['Name', 'Area', '2022-12-01 18:01:01+120863', '12', '24', 'RUR'], ['Name', 'Area', '2022-12-01 18:01:01+120863', '12', '24', 'RUR']])
+	>>> vacancies[0].area_name is vacancies[1].area_name, sorted(vacancies[1].__dict__)
+	(True, ['area_name', 'name', 'published_at', 'salary'])
 	"""
 	vacancies_objects = []
 
@@ -239,35 +608,56 @@ def csv_filer(titles: List[str], data: List[str]) -> List[Vacancy]:
 		for key, value in zip(titles, vacancy_data):
 			format_value(salary if 'salary' in key else vacancy, key, value)
 
+		encode_categories(vacancy)
+		encode_categories(salary)
 		vacancy['salary'] = Salary(**salary)
 		vacancies_objects.append(Vacancy(**vacancy))
 
 	return vacancies_objects
 
-def add_data(dict_object: dict, key: str, average_salary: float, add_empty: bool) -> None:
-	"""Добавляет новые значения в словарь при формировании статистики
+def csv_lazy_filer(titles: List[str], data: List[List[str]]) -> List[LazyVacancy]:
+	"""Формирует список вакансий, поля которых разбираются только при обращении к ним.
+	Фильтрация, сортировка и вывод таблицы разбирают только используемые поля и выводимые строки
+
+	Args:
+		titles (list): Заголовки csv-файла
+		data (list): Данные строк csv-файла
+
+	Returns:
+		List[LazyVacancy]: Список вакансий
+	"""
+	columns = {title: number for number, title in enumerate(titles)}
+	return [LazyVacancy(columns, vacancy_data) for vacancy_data in data]
+
+def add_data(dict_object: dict, key: str, average_salary: float, add_empty: bool, quantiles: bool = False) -> None:
+	"""Добавляет оклад к сумме окладов и увеличивает количество вакансий в словаре при формировании статистики
 
 	Args:
 		dict_object (dict): Объект словаря, в который нужно добавить данные
 		key (str): Ключ словаря, для которого нужно добавить данные 
 		average_salary (float): Среднее значенеи оклада
 		add_empty (bool): Нужно ли обнулить данные для указанного ключа
+		quantiles (bool): Нужно ли добавлять оклад в скетч квантилей
 	"""
 	if add_empty:
-		dict_object[key] = {'salary': [], 'count': 0}
-	dict_object[key]['salary'].append(average_salary)
+		dict_object[key] = {'salary': 0, 'count': 0}
+		if quantiles:
+			dict_object[key]['sketch'] = KLLSketch()
+	dict_object[key]['salary'] += average_salary
 	dict_object[key]['count'] += 1
+	if quantiles:
+		dict_object[key]['sketch'].update(average_salary)
 
 def calculate_average_salary(dict_object: dict) -> None:
-	"""Заменяет в словаре значение оклада на среднее значение оклада
+	"""Заменяет в словаре сумму окладов на среднее значение оклада
 
 	Args:
 		dict_object (dict): Объект словаря, в котором нужно обновить данные
 	"""
 	for key in dict_object:
-		dict_object[key]['salary'] = int(sum(dict_object[key]['salary']) / len(dict_object[key]['salary']))
+		dict_object[key]['salary'] = int(dict_object[key]['salary'] / dict_object[key]['count'])
 
-def print_vacancies(vacancies_data: list, filter_: list, sort_param: str, reverse_sort: bool, numbers: list, columns: list):
+def print_vacancies(vacancies_data: list, filter_: list, sort_param: str, reverse_sort: bool, numbers: list, columns: list, index: InvertedIndex = None):
 	"""Выводит на экран таблицу вакансий
 
 	Args:
@@ -277,26 +667,166 @@ def print_vacancies(vacancies_data: list, filter_: list, sort_param: str, revers
 		reverse_sort (bool): Сортировать в обратном порядке
 		numbers (list): Диапазон строк таблицы, которые нужно выводить
 		columns (list): Названия колонок таблицы, которые нужно выводить
+		index (InvertedIndex): Индекс навыков vacancies_data для фильтра по навыкам (по умолчанию строится заново)
 	"""
-	table = PrettyTable(hrules=ALL, field_names=list(table_fields.values()), max_width=20, align='l')
 	filter_key, filter_value = filter_
 
+	if filter_key == 'skills':
+		index = index or build_skill_index(vacancies_data)
+		vacancies_data = [vacancies_data[row_id] for row_id in index.search(filter_value)]
+		filter_key = None
+
+	# фильтр идет до сортировки: ключ сортировки вычисляется только для подходящих вакансий, а sorted устойчива,
+	# поэтому порядок строк тот же, что при фильтрации отсортированного списка
+	if filter_key:
+		vacancies_data = [vacancy for vacancy in vacancies_data if apply_filter(filter_key, filter_value, vacancy)]
 	if sort_param:
 		vacancies_data = sorted(vacancies_data, key= lambda v: apply_sort(sort_param, v), reverse=reverse_sort)
 
-	for vacancy in vacancies_data:
-		if filter_key and not apply_filter(filter_key, filter_value, vacancy):
-			continue
-		table.add_row([str(v)[:100]+'...' if len(str(v)) > 100 else str(v) for k, v in vacancy.__dict__.items() if k in table_fields.keys()])	
-	
-	if len(table.rows) == 0:
+	if len(vacancies_data) == 0:
 		return print('Ничего не найдено')
 
-	table.add_autoindex('№')
+	# в таблицу попадают только выводимые строки: значения остальных не нужно приводить к строкам и очищать
+	end = numbers[1] if len(numbers) == 2 else len(vacancies_data)
+	print_table(((number, vacancies_data[number]) for number in range(len(vacancies_data))[numbers[0]:end]), columns)
+
+def print_table(vacancies: Iterable[Tuple[int, Vacancy]], columns: list) -> None:
+	"""Выводит на экран таблицу вакансий
+
+	Args:
+		vacancies (Iterable[Tuple[int, Vacancy]]): Номера строк таблицы (с нуля) и вакансии, которые нужно выводить
+		columns (list): Названия колонок таблицы, которые нужно выводить
+	"""
+	from prettytable import PrettyTable, ALL
+
+	table = PrettyTable(hrules=ALL, field_names=['№']+list(table_fields.values()), max_width=20, align='l')
+	for number, vacancy in vacancies:
+		values = (str(getattr(vacancy, k, '')) for k in table_fields)
+		table.add_row([number + 1] + [v[:100]+'...' if len(v) > 100 else v for v in values])
 
-	end = numbers[1] if len(numbers) == 2 else len(table.rows)
 	columns = list(table_fields.values()) if len(columns) == 0 else [field for field in table_fields.values() if field in columns]
-	print(table.get_string(start=numbers[0], end=end, fields=['№']+columns))
+	print(table.get_string(fields=['№']+columns))
+
+def iter_csv_rows(file_name: str) -> Iterator[List[str]]:
+	"""Читает корректные строки csv-файла по одной, не храня файл в памяти.
+	Первым значением возвращаются заголовки
+
+	Args:
+		file_name (str): Название csv-файла
+
+	Yields:
+		List[str]: Заголовки, затем значения строк
+	"""
+	with open_text(file_name) as file:
+		titles = re.sub('\n|\r|\ufeff', '', file.readline()).split(',')
+		yield titles
+		rows = csv.reader(file)
+		for batch in iter(lambda: list(islice(rows, pipeline_batch_size)), []):
+			yield from filter_rows(batch, titles)
+
+def read_run(file) -> Iterator[tuple]:
+	"""Читает отсортированную часть, сохраненную external_sort во временный файл, и закрывает файл
+
+	Args:
+		file (BinaryIO): Временный файл
+
+	Yields:
+		tuple: Ключ сортировки и строка
+	"""
+	import pickle
+
+	with file:
+		while True:
+			try:
+				yield from pickle.load(file)
+			except EOFError:
+				return
+
+@profiler.timer('sorting')
+def external_sort(rows: Iterable[List[str]], key: Callable, reverse: bool = False, memory_limit: int = sort_memory_limit) -> Tuple[int, Iterator[List[str]]]:
+	"""Сортирует строки, которые могут не поместиться в памяти. Строки копятся частями примерно по memory_limit байт,
+	каждая часть сортируется и сохраняется во временный файл, а части лениво сливаются heapq.merge.
+	Как и sorted, сортировка устойчива: строки с равными ключами остаются в исходном порядке, в том числе при reverse
+
+	Args:
+		rows (Iterable[List[str]]): Строки
+		key (Callable): Функция ключа сортировки строки
+		reverse (bool): Сортировать в обратном порядке
+		memory_limit (int): Примерный объем памяти под одну часть в байтах
+
+	Returns:
+		Tuple[int, Iterator[List[str]]]: Количество строк и итератор отсортированных строк
+
+	>>> count, rows = external_sort([['b', '2'], ['a', '1'], ['b', '1'], ['a', '2']], key=lambda row: row[0], reverse=True, memory_limit=200)
+	>>> count, list(rows)
+	(4, [['b', '2'], ['b', '1'], ['a', '1'], ['a', '2']])
+	"""
+	import heapq
+	import pickle
+	import tempfile
+
+	runs, run, size, count = [], [], 0, 0
+	sort_key = lambda record: record[0]
+
+	def spill():
+		run.sort(key=sort_key, reverse=reverse)
+		file = tempfile.TemporaryFile()
+		for start in range(0, len(run), sort_block_size):
+			pickle.dump(run[start:start + sort_block_size], file, pickle.HIGHEST_PROTOCOL)
+		file.seek(0)
+		runs.append(file)
+		profiler.count('sort_runs_spilled')
+
+	for row in rows:
+		# номер строки делает ключи уникальными и сохраняет исходный порядок равных ключей
+		run.append(((key(row), -count if reverse else count), row))
+		count += 1
+		size += sum(map(sys.getsizeof, row)) + sys.getsizeof(row)
+		if size >= memory_limit:
+			spill()
+			run, size = [], 0
+
+	if not runs:
+		run.sort(key=sort_key, reverse=reverse)
+		return count, (row for _, row in run)
+	if run:
+		spill()
+	return count, (row for _, row in heapq.merge(*map(read_run, runs), key=sort_key, reverse=reverse))
+
+def print_vacancies_external(file_name: str, filter_: list, sort_param: str, reverse_sort: bool, numbers: list, columns: list, memory_limit: int = sort_memory_limit):
+	"""Выводит на экран таблицу вакансий из csv-файла, который может не поместиться в памяти: строки читаются потоком,
+	фильтруются, сортируются external_sort, и в таблицу разбираются только выводимые строки
+
+	Args:
+		file_name (str): Название csv-файла
+		filter_ (list): [0] — Ключ для фильтрации таблицы, [1] — Значение для фильтрации таблицы
+		sort_param (str): Параметр сортировки
+		reverse_sort (bool): Сортировать в обратном порядке
+		numbers (list): Диапазон строк таблицы, которые нужно выводить
+		columns (list): Названия колонок таблицы, которые нужно выводить
+		memory_limit (int): Примерный объем памяти под одну сортируемую часть в байтах
+	"""
+	if os.path.getsize(file_name) == 0:
+		return print('Пустой файл')
+
+	rows = iter_csv_rows(file_name)
+	titles_columns = {title: number for number, title in enumerate(next(rows))}
+	read = [0]
+
+	def valid_rows():
+		for row in rows:
+			read[0] += 1
+			if not filter_[0] or apply_filter(filter_[0], filter_[1], LazyVacancy(titles_columns, row)):
+				yield row
+
+	count, sorted_rows = external_sort(valid_rows(), lambda row: apply_sort(sort_param, LazyVacancy(titles_columns, row)), reverse_sort, memory_limit)
+	if read[0] == 0:
+		return print('Нет данных')
+	if count == 0:
+		return print('Ничего не найдено')
+
+	selected = range(count)[numbers[0]:numbers[1] if len(numbers) == 2 else count]
+	print_table(zip(selected, (LazyVacancy(titles_columns, row) for row in islice(sorted_rows, selected.start, selected.stop))), columns)
 
 def parse_filter(data: str):
 	"""Возвращает параметр филтрации, извлеченный из пользовательского ввода
@@ -352,12 +882,66 @@ def apply_filter(key, filter_value, vacancy):
 	False
 	>>> apply_filter('salary_currency', 'RUR', Vacancy('Программист', Salary('12', '36', 'RUR'), 'Москва', '2022-12-01 18:01:01+120863'))
 	True
+	>>> apply_filter('skills', 'Python & SQL | Go', LazyVacancy({'name': 0, 'key_skills': 1}, ['Программист', 'Python\\nSQL']))
+	True
 	"""
+	if key == 'skills':
+		return match_query(parse_query(filter_value), set(tokenize(get_vacancy_text(vacancy))))
 	if key == 'salary':
 		return vacancy.salary.salary_from <= float(filter_value) <= vacancy.salary.salary_to
 	if key == 'published_at':
 		return filter_value == datetime.strftime(vacancy.published_at, '%d.%m.%Y')
-	return filter_value == (vacancy.__dict__[key] if key in vacancy.__dict__ else vacancy.salary.__dict__[key])
+	return filter_value == (getattr(vacancy, key) if hasattr(vacancy, key) else vacancy.salary.__dict__[key])
+
+def get_vacancy_text(vacancy: Vacancy) -> str:
+	"""Возвращает текст вакансии, по которому ищутся навыки: ключевые навыки и описание
+
+	Args:
+		vacancy (Vacancy): Вакансия
+
+	Returns:
+		str: Текст вакансии
+	"""
+	return f"{getattr(vacancy, 'key_skills', '')}\n{getattr(vacancy, 'description', '')}"
+
+@profiler.timer('indexing')
+def build_skill_index(vacancies_data: List[Vacancy]) -> InvertedIndex:
+	"""Строит индекс навыков: номер строки — позиция вакансии в vacancies_data
+
+	Args:
+		vacancies_data (List[Vacancy]): Список вакансий
+
+	Returns:
+		InvertedIndex: Индекс навыков
+	"""
+	index = InvertedIndex()
+	for row_id, vacancy in enumerate(vacancies_data):
+		index.add(row_id, get_vacancy_text(vacancy))
+	return index
+
+def load_skill_index(file_name: str, vacancies_data: List[Vacancy]) -> InvertedIndex:
+	"""Загружает индекс навыков, сохраненный рядом с csv-файлом; если его нет или файл изменился,
+	строит индекс по vacancies_data и сохраняет его
+
+	Args:
+		file_name (str): Название csv-файла
+		vacancies_data (List[Vacancy]): Вакансии, прочитанные из файла
+
+	Returns:
+		InvertedIndex: Индекс навыков
+	"""
+	size = os.path.getsize(file_name)
+	fingerprint = get_file_fingerprint(file_name, size)
+	if os.path.exists(f'{file_name}{skill_index_suffix}'):
+		with open(f'{file_name}{skill_index_suffix}', 'r', encoding='utf-8') as file:
+			data = json.load(file)
+		if data.get('version') == skill_index_version and data['size'] == size and data['fingerprint'] == fingerprint and data['rows'] == len(vacancies_data):
+			return InvertedIndex.from_dict(data)
+
+	index = build_skill_index(vacancies_data)
+	with open(f'{file_name}{skill_index_suffix}', 'w', encoding='utf-8') as file:
+		json.dump({'version': skill_index_version, 'size': size, 'fingerprint': fingerprint, **index.to_dict()}, file, ensure_ascii=False)
+	return index
 
 def apply_sort(sort_param: str, vacancy: Vacancy):
 	"""Подготавливает значение для сравнения с другим значением при сортировке
@@ -376,52 +960,1149 @@ def apply_sort(sort_param: str, vacancy: Vacancy):
 	"""
 	if sort_param == 'salary':
 		return (vacancy.salary.salary_from + vacancy.salary.salary_to) / 2
-	return vacancy.__dict__[sort_param]
+	return getattr(vacancy, sort_param)
 
-def print_statistics(vacancies_data: List[Vacancy], prof_name: str) -> None:
-	"""Вычисляет и создает файл визуального представления статистики
+def compile_prof_matcher(prof_names: List[str]) -> Callable[[str], Set[str]]:
+	"""Компилирует функцию поиска всех профессий из списка в названии вакансии за один проход по строке.
+	Профессии объединяются в одно регулярное выражение (в порядке убывания длины) внутри lookahead,
+	поэтому находятся и пересекающиеся вхождения, а профессии, являющиеся подстрокой найденной, добавляются сразу
+
+	Args:
+		prof_names (List[str]): Названия профессий
+
+	Returns:
+		Callable[[str], Set[str]]: Функция, возвращающая множество профессий, входящих в название вакансии
+
+	>>> sorted(compile_prof_matcher(['Аналитик', 'Аналитик данных', 'данных'])('Аналитик данных'))
+	['Аналитик', 'Аналитик данных', 'данных']
+	>>> sorted(compile_prof_matcher(['Аналитик', 'Программист'])('Старший аналитик'))
+	[]
+	>>> sorted(compile_prof_matcher(['ab', 'bc'])('abc'))
+	['ab', 'bc']
+	"""
+	names = sorted(set(prof_names), key=len, reverse=True)
+	if not names:
+		return lambda vacancy_name: set()
+
+	nested = {name: [other for other in names if other in name] for name in names}
+	pattern = re.compile(f'(?=({"|".join(map(re.escape, names))}))')
+
+	def match(vacancy_name: str) -> Set[str]:
+		found = set()
+		for name in pattern.findall(vacancy_name):
+			if name not in found:
+				found.update(nested[name])
+		return found
+
+	return match
+
+@profiler.timer('aggregation')
+def collect_statistics(vacancies_data: List[Vacancy], prof_names: List[str], collected: Tuple[dict, dict, dict] = None, quantiles: bool = False) -> Tuple[dict, dict, dict]:
+	"""Собирает суммы окладов и количество вакансий по годам, по годам для каждой профессии и по городам за один проход
 
 	Args:
 		vacancies_data (list): Список вакансий
-		prof_name (str): Название профессии, для которой нужно подсчитать отдельную статистику
+		prof_names (List[str]): Названия профессий, для которых нужно подсчитать отдельную статистику
+		collected (Tuple[dict]): Ранее собранные данные, которые нужно дополнить
+		quantiles (bool): Нужно ли собирать скетчи квантилей окладов
+
+	Returns:
+		Tuple[dict]: Первый индекс — данные по годам, Второй — данные по годам для каждой профессии, Третий — данные по городам
 	"""
-	total_data = {}
-	prof_data = {}
-	cities = {}
+	total_data, prof_data, cities = collected or ({}, {}, {})
+	for prof_name in prof_names:
+		prof_data.setdefault(prof_name, {})
+	match_profs = compile_prof_matcher(prof_names)
+
+	# города копятся в списках по коду города; уже собранные данные переносятся в списки,
+	# чтобы суммы продолжали считаться в том же порядке, что и при полном пересчете
+	area_names = categories['area_name']
+	city_codes = [area_names.encode(city) for city in cities]
+	city_salaries = [0] * len(area_names)
+	city_counts = [0] * len(area_names)
+	city_sketches = [None] * len(area_names)
+	for code, data in zip(city_codes, cities.values()):
+		city_salaries[code], city_counts[code], city_sketches[code] = data['salary'], data['count'], data.get('sketch')
 
 	for vacancy in vacancies_data:
 		average_salary = (vacancy.salary.salary_from + vacancy.salary.salary_to) / 2
+		year = vacancy.published_at.year
 		# статистика городов
-		add_data(cities, vacancy.area_name, average_salary, vacancy.area_name not in cities.keys())
+		code = area_names.encode(vacancy.area_name)
+		if code >= len(city_counts):
+			grow = len(area_names) - len(city_counts)
+			city_salaries.extend([0] * grow)
+			city_counts.extend([0] * grow)
+			city_sketches.extend([None] * grow)
+		if not city_counts[code]:
+			city_codes.append(code)
+			if quantiles:
+				city_sketches[code] = KLLSketch()
+		city_salaries[code] += average_salary
+		city_counts[code] += 1
+		if quantiles:
+			city_sketches[code].update(average_salary)
 		# зарплаты и вакансии
-		add_data(total_data, vacancy.published_at.year, average_salary, vacancy.published_at.year not in total_data.keys())
-		# зарплаты и вакансии для профессии
-		if prof_name in vacancy.name:
-			add_data(prof_data, vacancy.published_at.year, average_salary, vacancy.published_at.year not in prof_data.keys())
+		add_data(total_data, year, average_salary, year not in total_data.keys(), quantiles)
+		# зарплаты и вакансии для профессий
+		for prof_name in match_profs(vacancy.name):
+			add_data(prof_data[prof_name], year, average_salary, year not in prof_data[prof_name].keys(), quantiles)
+
+	cities.clear()
+	for code in city_codes:
+		cities[area_names.values[code]] = {'salary': city_salaries[code], 'count': city_counts[code]}
+		if city_sketches[code] is not None:
+			cities[area_names.values[code]]['sketch'] = city_sketches[code]
+
+	return total_data, prof_data, cities
+
+def merge_data(dict_object: dict, other: dict) -> None:
+	"""Добавляет в словарь статистики данные словаря, собранного по другой части вакансий
+
+	Args:
+		dict_object (dict): Объект словаря, в который нужно добавить данные
+		other (dict): Словарь статистики, собранный по другой части вакансий
+	"""
+	for key, data in other.items():
+		if key not in dict_object:
+			dict_object[key] = data
+			continue
+		dict_object[key]['salary'] += data['salary']
+		dict_object[key]['count'] += data['count']
+		if 'sketch' in data:
+			dict_object[key]['sketch'].merge(data['sketch'])
+
+def merge_statistics(collected: Tuple[dict, dict, dict], other: Tuple[dict, dict, dict]) -> Tuple[dict, dict, dict]:
+	"""Объединяет данные collect_statistics, собранные параллельно по разным частям вакансий
+
+	Args:
+		collected (Tuple[dict]): Данные, в которые нужно добавить other
+		other (Tuple[dict]): Данные, собранные по другой части вакансий
+
+	Returns:
+		Tuple[dict]: Объединенные данные collected
+
+	>>> titles = ['name', 'area_name', 'published_at', 'salary_from', 'salary_to', 'salary_currency']
+	>>> first = collect_statistics(csv_filer(titles, [['Аналитик', 'Москва', '2022-12-01 18:01:01+120863', '10', '30', 'RUR']]), ['Аналитик'], quantiles=True)
+	>>> second = collect_statistics(csv_filer(titles, [['Аналитик', 'Казань', '2022-12-01 18:01:01+120863', '30', '50', 'RUR']]), ['Аналитик'], quantiles=True)
+	>>> total_data, prof_data, cities = merge_statistics(first, second)
+	>>> total_data[2022]['count'], list(cities), get_quantiles_statistics(prof_data['Аналитик'])
+	(2, ['Москва', 'Казань'], {2022: [20, 20, 40]})
+	"""
+	total_data, prof_data, cities = collected
+	other_total_data, other_prof_data, other_cities = other
+	merge_data(total_data, other_total_data)
+	merge_data(cities, other_cities)
+	for prof_name, years in other_prof_data.items():
+		merge_data(prof_data.setdefault(prof_name, {}), years)
+
+	return collected
+
+def get_quantiles_statistics(dict_object: dict, keys: list = None) -> dict:
+	"""Вычисляет 10% квантиль, медиану и 90% квантиль окладов по скетчам, собранным collect_statistics
+
+	Args:
+		dict_object (dict): Данные, собранные collect_statistics с quantiles=True
+		keys (list): Ключи, для которых нужно вычислить квантили (по умолчанию — все)
+
+	Returns:
+		dict: Квантили окладов для каждого ключа
+	"""
+	return {key: [int(value) for value in dict_object[key]['sketch'].quantiles([0.1, 0.5, 0.9])] for key in (dict_object if keys is None else keys)}
 
-	for dict_ in (total_data, prof_data, cities):
-		calculate_average_salary(dict_)
+def get_years_statistics(dict_object: dict) -> Tuple[dict, dict]:
+	"""Вычисляет динамику уровня зарплат и количества вакансий по годам
 
-	# убираем все города, в которых количество вакансий меньше 1% от общего числа вакансий
-	cities = {k: v for k, v in cities.items() if (lambda v: 1 if v >= 0.75 else 0)(cities[k]['count'] / len(vacancies_data) * 100) >= 1}
+	Args:
+		dict_object (dict): Данные по годам, собранные collect_statistics
+
+	Returns:
+		Tuple[dict]: Первый индекс — уровень зарплат по годам, Второй — количество вакансий по годам
+	"""
+	calculate_average_salary(dict_object)
+	return {year: dict_object[year]["salary"] for year in dict_object}, {year: dict_object[year]["count"] for year in dict_object}
+
+def get_cities_statistics(cities: dict, vacancies_count: int) -> Tuple[dict, dict]:
+	"""Вычисляет топ-10 городов по уровню зарплат и по доле вакансий
+
+	Args:
+		cities (dict): Данные по городам, собранные collect_statistics
+		vacancies_count (int): Общее количество вакансий
+
+	Returns:
+		Tuple[dict]: Первый индекс — уровень зарплат по городам, Второй — доля вакансий по городам
+	"""
+	import numpy as np
+
+	names = list(cities)
+	salaries = np.array([int(cities[name]['salary'] / cities[name]['count']) for name in names], dtype=np.int64)
+	counts = np.array([cities[name]['count'] for name in names], dtype=np.int64)
+	return get_top_cities(names, salaries, counts, vacancies_count)
+
+def get_top_cities(names: List[str], salaries, counts, vacancies_count: int) -> Tuple[dict, dict]:
+	"""Вычисляет топ-10 городов по уровню зарплат и по доле вакансий среди городов, где не меньше 1% вакансий
+
+	Args:
+		names (List[str]): Названия городов в порядке первого появления
+		salaries (np.ndarray): Средний оклад в каждом городе
+		counts (np.ndarray): Количество вакансий в каждом городе
+		vacancies_count (int): Общее количество вакансий
 
-	salaries = {year: total_data[year]["salary"] for year in total_data}
-	vacancies = {year: total_data[year]["count"] for year in total_data}
-	salaries_prof = {year: prof_data[year]["salary"] for year in prof_data}
-	vacancies_prof = {year: prof_data[year]["count"] for year in prof_data}
+	Returns:
+		Tuple[dict]: Первый индекс — уровень зарплат по городам, Второй — доля вакансий по городам
+	"""
+	import numpy as np
+
+	# убираем все города, в которых количество вакансий меньше 1% от общего числа вакансий (доля округляется от 0.75%)
+	kept = np.flatnonzero(counts / vacancies_count * 100 >= 0.75)
+	salaries_cities = {names[kept[i]]: int(salaries[kept[i]]) for i in top_k(salaries[kept], 10)}
+	vacancies_cities = {names[kept[i]]: float(f"{(int(counts[kept[i]]) / vacancies_count):.4f}") for i in top_k(counts[kept], 10)}
+
+	return salaries_cities, vacancies_cities
+
+def top_k(values, k: int):
+	"""Возвращает индексы k наибольших значений в порядке убывания без полной сортировки (argpartition).
+	Равные значения идут в порядке индексов, как при устойчивой сортировке sorted(..., reverse=True)
+
+	Args:
+		values (np.ndarray): Значения
+		k (int): Количество индексов
 
+	Returns:
+		np.ndarray: Индексы наибольших значений
+
+	>>> import numpy as np
+	>>> top_k(np.array([5, 1, 7, 5, 3, 7]), 3).tolist()
+	[2, 5, 0]
+	"""
+	import numpy as np
+
+	values = np.asarray(values)
+	candidates = np.arange(len(values))
+	if len(values) > k:
+		# все значения, равные k-му наибольшему, остаются кандидатами, чтобы порядок равных совпадал с sorted
+		threshold = values[np.argpartition(values, len(values) - k)[len(values) - k]]
+		candidates = np.flatnonzero(values >= threshold)
+	return candidates[np.lexsort((candidates, -values[candidates]))][:k]
+
+def get_code(vacancy: Vacancy, key: str) -> int:
+	"""Возвращает код категориального поля вакансии в общей таблице categories
+
+	Args:
+		vacancy (Vacancy): Вакансия
+		key (str): Название категориального поля
+
+	Returns:
+		int: Код значения в общей таблице categories
+	"""
+	value = vacancy.salary.salary_currency if key == 'salary_currency' else getattr(vacancy, key, '')
+	return categories[key].encode(value)
+
+def build_columns(vacancies_data: List[Vacancy]) -> dict:
+	"""Формирует колонки numpy для группировки: год, месяц, коды категориальных полей и средний оклад
+
+	Args:
+		vacancies_data (list): Список вакансий
+
+	Returns:
+		dict: Массивы 'year', 'year_month' (год * 12 + номер месяца с 0), 'area_name', 'salary_currency', 'experience_id' и 'salary'
+	"""
+	import numpy as np
+
+	count = len(vacancies_data)
+	columns = {
+		'year': np.fromiter((vacancy.published_at.year for vacancy in vacancies_data), np.int64, count),
+		'year_month': np.fromiter((vacancy.published_at.year * 12 + vacancy.published_at.month - 1 for vacancy in vacancies_data), np.int64, count),
+		'salary': np.fromiter(((vacancy.salary.salary_from + vacancy.salary.salary_to) / 2 for vacancy in vacancies_data), np.float64, count)
+	}
+	for key in group_keys[2:]:
+		columns[key] = np.fromiter((get_code(vacancy, key) for vacancy in vacancies_data), np.int64, count)
+	return columns
+
+def aggregate(columns: dict, by: str, mask=None) -> dict:
+	"""Группирует вакансии по одному из ключей group_keys и считает количество, сумму и средний оклад
+	через np.bincount. Группы идут в порядке первого появления, суммы копятся в порядке строк.
+	Если в колонках есть 'weight' (вакансии выборки, см. sample_csv_rows), строки учитываются с весами,
+	а для среднего оклада дополнительно вычисляется полуширина 95% доверительного интервала
+
+	Args:
+		columns (dict): Колонки, сформированные build_columns
+		by (str): Ключ группировки: 'year', 'year_month', 'area_name', 'salary_currency' или 'experience_id'
+		mask (np.ndarray): Маска строк, которые нужно учитывать (по умолчанию — все)
+
+	Returns:
+		dict: 'keys' — значения ключа групп, 'count', 'sum' и 'mean' — массивы по группам ('error' — для выборки)
+
+	>>> data = csv_filer(['name', 'area_name', 'published_at', 'salary_from', 'salary_to', 'salary_currency'], [['Аналитик', 'Москва', '2022-11-01 18:01:01+120863', '10', '30', 'RUR'], ['Программист', 'Казань', '2022-12-01 18:01:01+120863', '30', '50', 'RUR'], ['Аналитик', 'Москва', '2022-12-05 18:01:01+120863', '20', '20', 'RUR']])
+	>>> months = aggregate(build_columns(data), 'year_month')
+	>>> months['keys'], months['count'].tolist(), months['mean'].tolist()
+	(['2022-11', '2022-12'], [1, 2], [20.0, 30.0])
+	>>> aggregate(build_columns(data), 'area_name')['keys']
+	['Москва', 'Казань']
+	>>> import numpy as np
+	>>> columns = dict(build_columns(data), weight=np.array([100.0, 100.0, 300.0]))
+	>>> months = aggregate(columns, 'year_month')
+	>>> months['count'].tolist(), months['mean'].tolist(), months['error'].round(2).tolist()
+	([100.0, 400.0], [20.0, 25.0], [0.0, 10.39])
+	"""
+	import numpy as np
+
+	keys, values, weights = columns[by], columns['salary'], columns.get('weight')
+	if mask is not None:
+		keys, values = keys[mask], values[mask]
+		weights = None if weights is None else weights[mask]
+	if len(keys) == 0:
+		return {'keys': [], 'count': np.zeros(0, np.int64), 'sum': np.zeros(0), 'mean': np.zeros(0), 'error': np.zeros(0)}
+
+	# коды категориальных полей уже плотные, год и месяц сдвигаются к нулю
+	offset = int(keys.min()) if by in ('year', 'year_month') else 0
+	dense = keys - offset
+	rows = np.bincount(dense)
+	counts = rows if weights is None else np.bincount(dense, weights=weights)
+	sums = np.bincount(dense, weights=values if weights is None else values * weights)
+	first_rows = np.full(len(rows), len(dense))
+	np.minimum.at(first_rows, dense, np.arange(len(dense)))
+	groups = np.flatnonzero(rows)
+	groups = groups[np.argsort(first_rows[groups], kind='stable')]
+
+	if by == 'year':
+		labels = [int(group) + offset for group in groups]
+	elif by == 'year_month':
+		labels = [f'{(int(group) + offset) // 12}-{(int(group) + offset) % 12 + 1:02d}' for group in groups]
+	else:
+		labels = [categories[by].values[group] for group in groups]
+	result = {'keys': labels, 'count': counts[groups], 'sum': sums[groups], 'mean': sums[groups] / counts[groups]}
+	if weights is not None:
+		# дисперсия взвешенного среднего (отношения сумм) оценивается линеаризацией
+		means = np.zeros(len(rows))
+		means[groups] = result['mean']
+		deviations = np.bincount(dense, weights=(weights * (values - means[dense])) ** 2)
+		result['error'] = confidence_z * np.sqrt(deviations[groups]) / counts[groups]
+	return result
+
+@profiler.timer('aggregation')
+def get_columns_statistics(columns: dict, prof_mask) -> Tuple[dict, dict, dict, dict, dict, dict]:
+	"""Вычисляет словари статистики, которые выводит print_statistics, через группировки aggregate
+
+	Args:
+		columns (dict): Колонки, сформированные build_columns
+		prof_mask (np.ndarray): Маска вакансий выбранной профессии
+
+	Returns:
+		Tuple[dict]: Уровень зарплат и количество вакансий по годам, то же для профессии, уровень зарплат и доля вакансий по городам
+	"""
+	result = []
+	for mask in (None, prof_mask):
+		years = aggregate(columns, 'year', mask)
+		result += [dict(zip(years['keys'], years['mean'].astype(int).tolist())), dict(zip(years['keys'], years['count'].tolist()))]
+
+	cities = aggregate(columns, 'area_name')
+	return (*result, *get_top_cities(cities['keys'], cities['mean'].astype(int), cities['count'], len(columns['salary'])))
+
+class SharedColumns:
+	"""Колонки build_columns, опубликованные один раз в блоке multiprocessing.shared_memory.
+
+	При передаче в другой процесс объект не копирует данные: передаются только название блока, расположение колонок
+	и значения категориальных полей по кодам, а массивы numpy в процессе смотрят прямо в общую память.
+	Поэтому N параллельных запросов к одному набору вакансий занимают одну копию данных, а не N
+
+	Attributes:
+		layout (dict): Смещение в блоке, тип numpy и длина каждой колонки
+		labels (dict): Значения категориальных полей и названий вакансий по кодам
+		memory (SharedMemory): Блок общей памяти
+	"""
+	def __init__(self, columns: dict, labels: dict):
+		"""Конструктор класса. Создает блок общей памяти и копирует в него колонки
+
+		Args:
+			columns (dict): Колонки numpy
+			labels (dict): Значения категориальных полей по кодам
+		"""
+		from multiprocessing.shared_memory import SharedMemory
+
+		self.layout, size = {}, 0
+		for key, column in columns.items():
+			self.layout[key] = (size, column.dtype.str, len(column))
+			# колонки выравниваются по 64 байта
+			size += -(-column.nbytes // 64) * 64
+		self.labels = labels
+		self.memory = SharedMemory(create=True, size=max(size, 1))
+		for key, view in self.columns().items():
+			view[:] = columns[key]
+
+	def __getstate__(self):
+		return {'name': self.memory.name, 'layout': self.layout, 'labels': self.labels}
+
+	def __setstate__(self, state: dict):
+		from multiprocessing.shared_memory import SharedMemory
+
+		self.layout, self.labels = state['layout'], state['labels']
+		self.memory = SharedMemory(name=state['name'])
+
+	def columns(self) -> dict:
+		"""Возвращает колонки как массивы numpy поверх общей памяти (без копирования)
+
+		Returns:
+			dict: Колонки
+		"""
+		import numpy as np
+
+		return {key: np.ndarray(length, dtype, self.memory.buf, offset) for key, (offset, dtype, length) in self.layout.items()}
+
+	def unlink(self):
+		"""Освобождает блок общей памяти (вызывается процессом, создавшим набор, когда запросы выполнены)
+		"""
+		self.memory.close()
+		self.memory.unlink()
+
+
+# набор, к которому подключен процесс-обработчик запросов (см. attach_shared_columns)
+shared_columns = None
+
+def build_shared_columns(vacancies_data: List[Vacancy]) -> SharedColumns:
+	"""Публикует колонки build_columns и коды названий вакансий в общей памяти
+
+	Args:
+		vacancies_data (list): Список вакансий
+
+	Returns:
+		SharedColumns: Опубликованный набор
+	"""
+	import numpy as np
+
+	columns = build_columns(vacancies_data)
+	names = CategoryTable()
+	columns['name'] = np.fromiter((names.encode(vacancy.name) for vacancy in vacancies_data), np.int64, len(vacancies_data))
+	labels = {key: categories[key].values for key in group_keys[2:]}
+	labels['name'] = names.values
+	return SharedColumns(columns, labels)
+
+def attach_shared_columns(dataset: SharedColumns) -> None:
+	"""Подключает процесс-обработчик к опубликованному набору (initializer пула процессов).
+	Таблицы кодирования процесса заполняются значениями набора, чтобы aggregate подписывал группы так же
+
+	Args:
+		dataset (SharedColumns): Опубликованный набор
+	"""
+	global shared_columns
+	shared_columns = dataset
+	for key in group_keys[2:]:
+		categories[key].values = dataset.labels[key]
+		categories[key].codes = {value: code for code, value in enumerate(dataset.labels[key])}
+
+def query_statistics(prof_name: str) -> Tuple[dict, dict, dict, dict, dict, dict]:
+	"""Вычисляет статистику профессии по набору, к которому подключен процесс. Профессия ищется
+	среди различных названий вакансий, а маска строк получается индексированием по кодам названий
+
+	Args:
+		prof_name (str): Название профессии
+
+	Returns:
+		Tuple[dict]: Словари статистики, как у get_columns_statistics
+	"""
+	import numpy as np
+
+	columns, names = shared_columns.columns(), shared_columns.labels['name']
+	matched = np.fromiter((prof_name in name for name in names), bool, len(names))
+	return get_columns_statistics(columns, matched[columns['name']])
+
+def get_parallel_statistics(vacancies_data: List[Vacancy], prof_names: List[str], workers: int = None) -> dict:
+	"""Вычисляет статистику нескольких профессий параллельно: набор колонок публикуется в общей памяти один раз,
+	и процессы-обработчики выполняют запросы над ним без копирования и повторного разбора.
+	Сейчас функцию вызывает только замер shared_queries в benchmark.py: 322.py и 323.py по-прежнему
+	передают процессам названия файлов, и каждый процесс разбирает свой файл-раздел
+
+	Args:
+		vacancies_data (list): Список вакансий
+		prof_names (List[str]): Названия профессий
+		workers (int): Количество процессов (по умолчанию — число ядер)
+
+	Returns:
+		dict: Словари статистики get_columns_statistics для каждой профессии
+	"""
+	from concurrent.futures import ProcessPoolExecutor
+
+	dataset = build_shared_columns(vacancies_data)
+	try:
+		with ProcessPoolExecutor(workers, initializer=attach_shared_columns, initargs=(dataset,)) as executor:
+			return dict(zip(prof_names, executor.map(query_statistics, prof_names)))
+	finally:
+		dataset.unlink()
+
+def get_professions_statistics(vacancies_data: List[Vacancy], prof_names: List[str]) -> dict:
+	"""Вычисляет статистику сразу для нескольких профессий за один проход по списку вакансий
+
+	Args:
+		vacancies_data (list): Список вакансий
+		prof_names (List[str]): Названия профессий, для которых нужно подсчитать отдельную статистику
+
+	Returns:
+		dict: Общая статистика по годам и по городам, а также статистика по годам для каждой профессии
+
+	>>> data = csv_filer(['name', 'area_name', 'published_at', 'salary_from', 'salary_to', 'salary_currency'], [['Аналитик данных', 'Москва', '2022-12-01 18:01:01+120863', '10', '30', 'RUR'], ['Программист', 'Москва', '2021-12-01 18:01:01+120863', '30', '50', 'RUR']])
+	>>> stats = get_professions_statistics(data, ['Аналитик', 'Программист', 'Дизайнер'])
+	>>> stats['salaries'], stats['cities_vacancies']
+	({2022: 20, 2021: 40}, {'Москва': 1.0})
+	>>> stats['professions']
+	{'Аналитик': {'salaries': {2022: 20}, 'vacancies': {2022: 1}}, 'Программист': {'salaries': {2021: 40}, 'vacancies': {2021: 1}}, 'Дизайнер': {'salaries': {}, 'vacancies': {}}}
+	"""
+	total_data, prof_data, cities = collect_statistics(vacancies_data, prof_names)
+	salaries, vacancies = get_years_statistics(total_data)
+	cities_salaries, cities_vacancies = get_cities_statistics(cities, len(vacancies_data))
+	professions = {}
+
+	for prof_name in prof_data:
+		salaries_prof, vacancies_prof = get_years_statistics(prof_data[prof_name])
+		professions[prof_name] = {'salaries': salaries_prof, 'vacancies': vacancies_prof}
+
+	return {'salaries': salaries, 'vacancies': vacancies, 'professions': professions, 'cities_salaries': cities_salaries, 'cities_vacancies': cities_vacancies}
+
+def report_statistics(prof_name: str, total_data: dict, prof_year_data: dict, cities: dict, vacancies_count: int, quantiles: bool = False, cache_key: str = None) -> None:
+	"""Выводит собранную статистику и создает файл ее визуального представления
+
+	Args:
+		prof_name (str): Название профессии, для которой подсчитана отдельная статистика
+		total_data (dict): Данные по годам
+		prof_year_data (dict): Данные по годам для prof_name
+		cities (dict): Данные по городам
+		vacancies_count (int): Общее количество вакансий
+		quantiles (bool): Нужно ли выводить квантили окладов (данные должны быть собраны с quantiles=True)
+		cache_key (str): Ключ, под которым результат нужно сохранить в кэш статистики
+	"""
+	salaries, vacancies = get_years_statistics(total_data)
+	salaries_prof, vacancies_prof = get_years_statistics(prof_year_data)
+	salaries_cities, vacancies_cities = get_cities_statistics(cities, vacancies_count)
+
+	quantiles_to_print = None
+	if quantiles:
+		quantiles_to_print = {'salaries': get_quantiles_statistics(total_data), 'salaries_prof': get_quantiles_statistics(prof_year_data), 'cities_salaries': get_quantiles_statistics(cities, salaries_cities)}
+
+	show_statistics(prof_name, salaries, vacancies, salaries_prof, vacancies_prof, salaries_cities, vacancies_cities, quantiles_to_print, cache_key)
+
+def show_statistics(prof_name: str, salaries: dict, vacancies: dict, salaries_prof: dict, vacancies_prof: dict, salaries_cities_to_print: dict, vacancies_cities_to_print: dict, quantiles_to_print: dict = None, cache_key: str = None) -> None:
+	"""Выводит словари статистики и создает файл ее визуального представления
+
+	Args:
+		prof_name (str): Название профессии, для которой подсчитана отдельная статистика
+		salaries (dict): Уровень зарплат по годам
+		vacancies (dict): Количество вакансий по годам
+		salaries_prof (dict): Уровень зарплат по годам для prof_name
+		vacancies_prof (dict): Количество вакансий по годам для prof_name
+		salaries_cities_to_print (dict): Уровень зарплат по городам
+		vacancies_cities_to_print (dict): Доля вакансий по городам
+		quantiles_to_print (dict): Квантили зарплат или None
+		cache_key (str): Ключ, под которым результат нужно сохранить в кэш статистики (None — не сохранять)
+	"""
+	statistics = [salaries, vacancies, salaries_prof, vacancies_prof, salaries_cities_to_print, vacancies_cities_to_print, quantiles_to_print]
+	print_statistics_dictionaries(*statistics)
+	Report(prof_name, *statistics).generate_image()
+	if cache_key:
+		store_cached_statistics(cache_key, statistics)
+
+def print_statistics_dictionaries(salaries: dict, vacancies: dict, salaries_prof: dict, vacancies_prof: dict, salaries_cities_to_print: dict, vacancies_cities_to_print: dict, quantiles_to_print: dict = None) -> None:
+	"""Выводит словари статистики (аргументы как у show_statistics)
+	"""
 	print('Динамика уровня зарплат по годам:', salaries)
 	print('Динамика количества вакансий по годам:', vacancies)
 	print('Динамика уровня зарплат по годам для выбранной профессии:', salaries_prof)
 	print('Динамика количества вакансий по годам для выбранной профессии:', vacancies_prof)
-	top10 = dict(islice({k: v for k, v in sorted(cities.items(), key=lambda item: item[1]['salary'], reverse=True)}.items(), 10))
-	salaries_cities_to_print = {k: top10[k]['salary'] for k in top10}
 	print('Уровень зарплат по городам (в порядке убывания):', salaries_cities_to_print)
-	top10 = dict(islice({k: v for k, v in sorted(cities.items(), key=lambda item: item[1]['count'], reverse=True)}.items(), 10))
-	vacancies_cities_to_print = {k: float(f"{(top10[k]['count'] / len(vacancies_data)):.4f}") for k in top10}
 	print('Доля вакансий по городам (в порядке убывания):', vacancies_cities_to_print)
+	if quantiles_to_print:
+		print('Квантили уровня зарплат по годам (10%, медиана, 90%):', quantiles_to_print['salaries'])
+		print('Квантили уровня зарплат по годам для выбранной профессии (10%, медиана, 90%):', quantiles_to_print['salaries_prof'])
+		print('Квантили уровня зарплат по городам (10%, медиана, 90%):', quantiles_to_print['cities_salaries'])
+
+def print_statistics(vacancies_data: List[Vacancy], prof_name: str, quantiles: bool = False) -> None:
+	"""Вычисляет и создает файл визуального представления статистики
+
+	Args:
+		vacancies_data (list): Список вакансий
+		prof_name (str): Название профессии, для которой нужно подсчитать отдельную статистику
+		quantiles (bool): Нужно ли дополнительно вычислить квантили окладов (10%, медиана, 90%)
+	"""
+	if quantiles:
+		total_data, prof_data, cities = collect_statistics(vacancies_data, [prof_name], quantiles=True)
+		return report_statistics(prof_name, total_data, prof_data[prof_name], cities, len(vacancies_data), True)
+
+	import numpy as np
+
+	prof_mask = np.fromiter((prof_name in vacancy.name for vacancy in vacancies_data), bool, len(vacancies_data))
+	show_statistics(prof_name, *get_columns_statistics(build_columns(vacancies_data), prof_mask))
+
+def read_record(data, start: int) -> Tuple[List[str], int]:
+	"""Читает запись csv-файла, начинающуюся с позиции start. Значения в кавычках могут содержать переводы строк,
+	поэтому запись заканчивается на первом переводе строки, перед которым с начала записи четное число кавычек
 
-	Report(prof_name, salaries, vacancies, salaries_prof, vacancies_prof, salaries_cities_to_print, vacancies_cities_to_print).generate_image()
+	Args:
+		data (mmap.mmap): Содержимое csv-файла
+		start (int): Позиция начала записи
+
+	Returns:
+		Tuple[List[str], int]: Значения записи (пустой список, если start — не начало записи) и позиция начала следующей записи
+
+	>>> read_record(b'a,"b\\nc"\\nd,e\\n', 0)
+	(['a', 'b\\nc'], 8)
+	"""
+	end, quotes = start, 0
+	while end < len(data):
+		newline = data.find(b'\n', end)
+		stop = newline + 1 if newline >= 0 else len(data)
+		quotes += data[end:stop].count(b'"')
+		end = stop
+		if quotes % 2 == 0:
+			break
+	# при чтении не с начала записи кавычки сбиваются, и текст разбирается не на одну запись
+	rows = list(csv.reader(io.StringIO(data[start:end].decode('utf-8', 'replace'), newline='')))
+	return rows[0] if len(rows) == 1 else [], end
+
+def align_record(data, position: int, fields: int) -> int:
+	"""Находит начало первой записи csv-файла не раньше позиции position. Перевод строки может оказаться
+	внутри значения в кавычках, поэтому начало принимается, только если с него подряд читаются
+	sample_align_records записей с нужным числом полей
+
+	Args:
+		data (mmap.mmap): Содержимое csv-файла
+		position (int): Позиция, с которой начинается поиск
+		fields (int): Количество полей в записи
+
+	Returns:
+		int: Позиция начала записи (длина файла, если записей дальше нет)
+
+	>>> data = b'a,"b\\nc,d"\\ne,f\\ng,h\\n'
+	>>> align_record(data, 5, 2), align_record(data, 1, 2)
+	(10, 10)
+	"""
+	while position < len(data):
+		if data[position - 1:position] != b'\n':
+			newline = data.find(b'\n', position)
+			if newline < 0:
+				break
+			position = newline + 1
+			continue
+		start, records = position, 0
+		while records < sample_align_records and start < len(data):
+			row, start = read_record(data, start)
+			if len(row) != fields:
+				break
+			records += 1
+		else:
+			return position
+		position += 1
+	return len(data)
+
+def sample_csv_rows(file_name: str, size: int = sample_size, seed: int = None) -> Tuple[List[str], List[List[str]], list, int]:
+	"""Выбирает случайные корректные строки csv-файла и вес каждой — сколько строк файла она представляет.
+
+	Несжатый файл больше sample_scan_limit байт не читается целиком: выбираются окна по sample_window байт
+	со случайных смещений (окно у конца файла продолжается с начала), и берутся все записи, начинающиеся в окне.
+	Каждая запись попадает в окно с одинаковой вероятностью независимо от своей длины, поэтому веса строк равны,
+	а их сумма оценивает количество строк файла. Окна выбираются, пока не прочитано size записей.
+	Остальные файлы читаются за один проход с резервуарной выборкой, и число строк известно точно
+
+	Args:
+		file_name (str): Название csv-файла
+		size (int): Размер выборки
+		seed (int): Начальное значение генератора случайных чисел
+
+	Returns:
+		Tuple: Заголовки, значения выбранных строк, их веса и точное количество корректных строк файла
+		(None при выборке окнами); None, если в файле нет заголовков
+	"""
+	rng = random.Random(seed)
+	if detect_compression(file_name) is None and os.path.getsize(file_name) > sample_scan_limit:
+		import mmap
+
+		with open(file_name, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+			header_end = data.find(b'\n') + 1
+			titles = re.sub('\r|\ufeff', '', data[:header_end - 1].decode('utf-8')).split(',')
+			data_size = len(data) - header_end
+			sample, windows, records = [], 0, 0
+			while records < size and windows * sample_window < data_size:
+				offset = rng.randrange(header_end, len(data))
+				windows += 1
+				for low, high in ((offset, min(offset + sample_window, len(data))), (header_end, header_end + offset + sample_window - len(data))):
+					position = align_record(data, low, len(titles)) if low > header_end else low
+					while position < high:
+						row, position = read_record(data, position)
+						records += 1
+						sample.append(row)
+		sample, _ = validate_rows(sample, titles)
+		return titles, sample, [data_size / (sample_window * windows)] * len(sample), None
+
+	with open_text(file_name) as file:
+		header = file.readline()
+		if header == '':
+			return None
+		titles = re.sub('\n|\r|\ufeff', '', header).split(',')
+		sample, population, reader = [], 0, csv.reader(file)
+		for batch in iter(lambda: list(islice(reader, pipeline_batch_size)), []):
+			for row in validate_rows(batch, titles)[0]:
+				if population < size:
+					sample.append(row)
+				else:
+					position = rng.randrange(population + 1)
+					if position < size:
+						sample[position] = row
+				population += 1
+	return titles, sample, [population / len(sample)] * len(sample) if sample else [], population
+
+def print_sample_statistics(file_name: str, prof_name: str, size: int = sample_size, seed: int = None) -> None:
+	"""Быстро оценивает статистику print_statistics по случайной выборке строк csv-файла (режим --sample).
+	Количества вакансий пересчитываются на весь файл, для средних окладов выводятся 95% доверительные интервалы
+
+	Args:
+		file_name (str): Название csv-файла
+		prof_name (str): Название профессии, для которой нужно подсчитать отдельную статистику
+		size (int): Размер выборки
+		seed (int): Начальное значение генератора случайных чисел
+	"""
+	import numpy as np
+
+	sampled = sample_csv_rows(file_name, size, seed) if os.path.getsize(file_name) > 0 else None
+	if sampled is None:
+		return print('Пустой файл')
+	titles, data, weights, population = sampled
+	if not data:
+		return print('Нет данных')
+
+	vacancies_data = csv_filer(titles, data)
+	columns = dict(build_columns(vacancies_data), weight=np.array(weights))
+	prof_mask = np.fromiter((prof_name in vacancy.name for vacancy in vacancies_data), bool, len(vacancies_data))
+	total = int(round(sum(weights)))
+	# поправка на конечность совокупности: выборка без возвращения из всего файла не имеет ошибки
+	correction = np.sqrt(1 - len(data) / population) if population else 1
+
+	result, intervals = [], []
+	for mask in (None, prof_mask):
+		years = aggregate(columns, 'year', mask)
+		result += [dict(zip(years['keys'], years['mean'].astype(int).tolist())), dict(zip(years['keys'], np.rint(years['count']).astype(int).tolist()))]
+		intervals.append({year: (int(mean - error), int(mean + error)) for year, mean, error in zip(years['keys'], years['mean'], years['error'] * correction)})
+	cities = aggregate(columns, 'area_name')
+	salaries_cities, vacancies_cities = get_top_cities(cities['keys'], cities['mean'].astype(int), np.rint(cities['count']).astype(np.int64), total)
+	cities_intervals = {city: (int(mean - error), int(mean + error)) for city, mean, error in zip(cities['keys'], cities['mean'], cities['error'] * correction)}
+
+	print(f'Оценка по выборке из {len(data)} строк, всего около {total} вакансий')
+	show_statistics(prof_name, *result, salaries_cities, vacancies_cities)
+	print('Доверительные интервалы уровня зарплат по годам (95%):', intervals[0])
+	print('Доверительные интервалы уровня зарплат по годам для выбранной профессии (95%):', intervals[1])
+	print('Доверительные интервалы уровня зарплат по городам (95%):', {city: cities_intervals[city] for city in salaries_cities})
+
+def read_batches(file_name: str, batch_size: int, batches: queue.Queue, stop: threading.Event) -> None:
+	"""Читает csv-файл пачками строк и кладет их в очередь (выполняется в потоке чтения конвейера).
+	Первым элементом в очередь кладутся заголовки, последним — None; ошибка чтения передается через очередь
+
+	Args:
+		file_name (str): Название csv-файла
+		batch_size (int): Количество строк в пачке
+		batches (queue.Queue): Ограниченная очередь пачек
+		stop (threading.Event): Признак того, что чтение нужно прекратить
+	"""
+	def put(item) -> bool:
+		while not stop.is_set():
+			try:
+				batches.put(item, timeout=0.1)
+				return True
+			except queue.Full:
+				pass
+		return False
+
+	try:
+		with open_text(file_name) as file:
+			titles = re.sub('\n|\r|\ufeff', '', file.readline()).split(',')
+			if not put(titles):
+				return
+			rows = csv.reader(file)
+			while True:
+				batch = list(islice(rows, batch_size))
+				if not batch or not put(filter_rows(batch, titles)):
+					break
+		put(None)
+	except Exception as error:
+		put(error)
+
+def parse_batch(titles: List[str], data: List[List[str]]) -> List[Vacancy]:
+	"""Формирует вакансии из пачки строк (выполняется в процессе-обработчике конвейера).
+	Одинаковые значения категориальных полей пачки — одна строка, поэтому pickle передает их один раз
+
+	Args:
+		titles (List[str]): Заголовки csv-файла
+		data (List[List[str]]): Значения строк пачки
+
+	Returns:
+		List[Vacancy]: Список вакансий
+	"""
+	return csv_filer(titles, data)
+
+def iter_pipeline(file_name: str, worker: Callable, args: tuple = (), batch_size: int = pipeline_batch_size, workers: int = None):
+	"""Обрабатывает csv-файл конвейером: поток чтения -> очередь пачек -> процессы-обработчики.
+	Чтение, обработка пачек и обработка их результатов идут одновременно, а ограниченные очереди не дают
+	быстрому этапу уйти далеко вперед медленного. Результаты возвращаются в порядке строк файла
+
+	Args:
+		file_name (str): Название csv-файла
+		worker (Callable): Функция уровня модуля worker(titles, data, *args), обрабатывающая пачку строк
+		args (tuple): Дополнительные аргументы worker
+		batch_size (int): Количество строк в пачке
+		workers (int): Количество процессов-обработчиков (по умолчанию — число ядер; 1 — обработка в текущем процессе)
+
+	Yields:
+		Any: Результат worker для очередной пачки строк
+	"""
+	workers = workers or os.cpu_count() or 1
+	batches, stop = queue.Queue(pipeline_queue_size), threading.Event()
+	reader = threading.Thread(target=read_batches, args=(file_name, batch_size, batches, stop), daemon=True)
+	executor, pending = None, deque()
+	if workers > 1:
+		from concurrent.futures import ProcessPoolExecutor
+		executor = ProcessPoolExecutor(workers)
+
+	reader.start()
+	try:
+		titles = None
+		while True:
+			batch = batches.get()
+			if isinstance(batch, Exception):
+				raise batch
+			if batch is None:
+				break
+			if titles is None:
+				titles = batch
+				continue
+			if executor is None:
+				yield worker(titles, batch, *args)
+				continue
+			pending.append(executor.submit(worker, titles, batch, *args))
+			if len(pending) >= workers * 2:
+				yield pending.popleft().result()
+		while pending:
+			yield pending.popleft().result()
+	finally:
+		stop.set()
+		reader.join()
+		if executor is not None:
+			executor.shutdown(cancel_futures=True)
+
+def iter_vacancy_batches(file_name: str, batch_size: int = pipeline_batch_size, workers: int = None):
+	"""Читает и разбирает csv-файл конвейером (см. iter_pipeline)
+
+	Args:
+		file_name (str): Название csv-файла
+		batch_size (int): Количество строк в пачке
+		workers (int): Количество процессов разбора
+
+	Yields:
+		List[Vacancy]: Вакансии очередной пачки строк
+	"""
+	return iter_pipeline(file_name, parse_batch, (), batch_size, workers)
+
+def print_pipeline_statistics(file_name: str, prof_name: str, batch_size: int = pipeline_batch_size, workers: int = None, quantiles: bool = False, cache_key: str = None) -> None:
+	"""Вычисляет статистику по csv-файлу, собирая ее по мере разбора пачек строк конвейером
+
+	Args:
+		file_name (str): Название csv-файла
+		prof_name (str): Название профессии, для которой нужно подсчитать отдельную статистику
+		batch_size (int): Количество строк в пачке
+		workers (int): Количество процессов разбора
+		quantiles (bool): Нужно ли дополнительно вычислить квантили окладов (10%, медиана, 90%)
+		cache_key (str): Ключ, под которым результат нужно сохранить в кэш статистики
+	"""
+	if os.path.getsize(file_name) == 0:
+		return print('Пустой файл')
+
+	collected, rows = ({}, {}, {}), 0
+	for vacancies_data in iter_vacancy_batches(file_name, batch_size, workers):
+		collect_statistics(vacancies_data, [prof_name], collected, quantiles)
+		rows += len(vacancies_data)
+	if rows == 0:
+		return print('Нет данных')
+
+	total_data, prof_data, cities = collected
+	report_statistics(prof_name, total_data, prof_data[prof_name], cities, rows, quantiles, cache_key)
+
+def split_skills(value: str) -> List[str]:
+	"""Разбивает значение key_skills на навыки (в выгрузке hh.ru они разделены переводами строк или запятыми)
+
+	Args:
+		value (str): Значение key_skills
+
+	Returns:
+		List[str]: Навыки
+
+	>>> split_skills('Python\\nSQL, Git\\n')
+	['Python', 'SQL', 'Git']
+	"""
+	return [skill for skill in skill_separator.split(value.strip()) if skill]
+
+def count_skills(titles: List[str], data: List[List[str]], prof_names: List[str], capacity: int) -> Tuple[dict, dict]:
+	"""Подсчитывает навыки пачки строк по годам и по профессиям (выполняется в процессе-обработчике конвейера).
+	Строки не превращаются в вакансии: нужны только название, навыки и год публикации
+
+	Args:
+		titles (List[str]): Заголовки csv-файла
+		data (List[List[str]]): Значения строк пачки
+		prof_names (List[str]): Названия профессий
+		capacity (int): Вместимость скетчей частых навыков
+
+	Returns:
+		Tuple[dict]: Первый индекс — скетчи навыков по годам, Второй — скетчи навыков по профессиям
+	"""
+	name_index, skills_index, published_index = titles.index('name'), titles.index('key_skills'), titles.index('published_at')
+	match_profs = compile_prof_matcher(prof_names)
+	years, professions = {}, {prof_name: FrequentItemsSketch(capacity) for prof_name in prof_names}
+
+	for row in data:
+		skills = split_skills(row[skills_index])
+		year = int(row[published_index][:4])
+		sketches = [years[year] if year in years else years.setdefault(year, FrequentItemsSketch(capacity))]
+		sketches.extend(professions[prof_name] for prof_name in match_profs(row[name_index]))
+		for sketch in sketches:
+			for skill in skills:
+				sketch.update(skill)
+
+	return years, professions
+
+def merge_sketches(dict_object: dict, other: dict) -> None:
+	"""Добавляет в словарь скетчей скетчи, собранные по другой части строк
+
+	Args:
+		dict_object (dict): Объект словаря, в который нужно добавить скетчи
+		other (dict): Скетчи, собранные по другой части строк
+	"""
+	for key, sketch in other.items():
+		if key in dict_object:
+			dict_object[key].merge(sketch)
+		else:
+			dict_object[key] = sketch
+
+def print_skills_statistics(file_name: str, prof_names: List[str], top: int = 10, batch_size: int = pipeline_batch_size, workers: int = None, capacity: int = 1000) -> None:
+	"""Выводит самые востребованные навыки по годам и по профессиям и создает файл их визуального представления.
+	Навыки считаются конвейером по пачкам строк в скетчах частых элементов, поэтому память ограничена
+	даже при очень большом количестве различных навыков
+
+	Args:
+		file_name (str): Название csv-файла
+		prof_names (List[str]): Названия профессий, для которых нужно подсчитать навыки
+		top (int): Количество навыков в каждом списке
+		batch_size (int): Количество строк в пачке
+		workers (int): Количество процессов-обработчиков
+		capacity (int): Вместимость скетчей: до 2 * capacity различных навыков подсчитываются точно
+	"""
+	if os.path.getsize(file_name) == 0:
+		return print('Пустой файл')
+	with open_text(file_name) as file:
+		if 'key_skills' not in re.sub('\n|\r|\ufeff', '', file.readline()).split(','):
+			return print('Нет данных о навыках')
+
+	years, professions = {}, {}
+	for years_batch, professions_batch in iter_pipeline(file_name, count_skills, (prof_names, capacity), batch_size, workers):
+		merge_sketches(years, years_batch)
+		merge_sketches(professions, professions_batch)
+	if not years:
+		return print('Нет данных')
+
+	total = FrequentItemsSketch(capacity)
+	for sketch in years.values():
+		total.merge(sketch)
+	skills_years = {year: dict(years[year].top(top)) for year in sorted(years)}
+	skills_professions = {prof_name: dict(sketch.top(top)) for prof_name, sketch in professions.items()}
+
+	print('Самые востребованные навыки по годам:', skills_years)
+	print('Самые востребованные навыки для выбранных профессий:', skills_professions)
+	if total.error:
+		print(f'Навыков больше, чем помещается в скетч: количества занижены не более чем на {total.error}')
+	Report.generate_skills_image(dict(total.top(top)), skills_professions)
+
+def get_file_fingerprint(file_name: str, offset: int) -> dict:
+	"""Вычисляет отпечаток уже прочитанной части файла: хеши ее начала и конца
+
+	Args:
+		file_name (str): Название csv-файла
+		offset (int): Смещение, до которого файл прочитан
+
+	Returns:
+		dict: Хеши начала и конца прочитанной части файла
+	"""
+	import hashlib
+
+	with open(file_name, 'rb') as file:
+		head = file.read(min(offset, state_fingerprint_size))
+		file.seek(max(offset - state_fingerprint_size, 0))
+		tail = file.read(min(offset, state_fingerprint_size))
+
+	return {'head': hashlib.sha1(head).hexdigest(), 'tail': hashlib.sha1(tail).hexdigest()}
+
+def load_statistics_state(file_name: str) -> dict:
+	"""Загружает сохраненное состояние статистики для csv-файла, если оно не устарело
+
+	Args:
+		file_name (str): Название csv-файла
+
+	Returns:
+		dict or None: Состояние статистики или None, если состояния нет, файл был перезаписан, а не дописан, или изменились курсы валют
+	"""
+	if not os.path.exists(f'{file_name}{state_suffix}'):
+		return None
+	with open(f'{file_name}{state_suffix}', 'r', encoding='utf-8') as file:
+		state = json.load(file)
+
+	# суммы окладов в состоянии посчитаны по курсам currency_to_rub на момент сохранения
+	if state.get('version') != state_version or state.get('rates') != currency_to_rub or os.path.getsize(file_name) < state['offset']:
+		return None
+	if get_file_fingerprint(file_name, state['offset']) != state['fingerprint']:
+		return None
+
+	# ключи json — всегда строки, года нужно вернуть к int
+	state['total_data'] = {int(year): data for year, data in state['total_data'].items()}
+	state['prof_data'] = {prof_name: {int(year): data for year, data in years.items()} for prof_name, years in state['prof_data'].items()}
+	return state
+
+def update_statistics_state(file_name: str, prof_names: List[str]) -> dict:
+	"""Дополняет сохраненное состояние статистики строками, дописанными в csv-файл, и сохраняет его.
+	Если состояния нет, оно устарело или в нем нет нужных профессий, статистика собирается заново
+
+	Args:
+		file_name (str): Название csv-файла
+		prof_names (List[str]): Названия профессий, для которых нужно подсчитать отдельную статистику
+
+	Returns:
+		dict: Состояние статистики по всему файлу
+	"""
+	state = load_statistics_state(file_name)
+	if state is None or not set(prof_names) <= set(state['prof_names']):
+		known_names = state['prof_names'] if state else []
+		state = {'version': state_version, 'rates': currency_to_rub, 'offset': 0, 'rows': 0, 'prof_names': known_names + [name for name in prof_names if name not in known_names], 'total_data': {}, 'prof_data': {}, 'cities': {}}
+
+	titles, data, trailing, state['offset'] = csv_tail_reader(file_name, state['offset'])
+	collect_statistics(csv_filer(titles, data), state['prof_names'], (state['total_data'], state['prof_data'], state['cities']))
+	state['rows'] += len(data)
+	state['fingerprint'] = get_file_fingerprint(file_name, state['offset'])
+
+	# в папку только для чтения состояние не сохраняется: следующий запуск прочитает файл заново
+	try:
+		with open(f'{file_name}{state_suffix}', 'w', encoding='utf-8') as file:
+			json.dump(state, file, ensure_ascii=False)
+	except OSError:
+		pass
+
+	# последняя строка без перевода строки входит в результат, но не в сохраненное состояние
+	if trailing:
+		state = copy.deepcopy(state)
+		collect_statistics(csv_filer(titles, trailing), state['prof_names'], (state['total_data'], state['prof_data'], state['cities']))
+		state['rows'] += len(trailing)
+	return state
+
+def get_statistics_cache_key(file_name: str, prof_name: str, quantiles: bool = False) -> str:
+	"""Вычисляет ключ кэша статистики: отпечаток файла (размер, время изменения, хеши начала и конца),
+	профессия, версия курсов валют currency_to_rub и версия кода (хеш этого скрипта и модулей, от которых зависит результат).
+	Первая часть ключа зависит только от файла, профессии и вывода квантилей, по ней находятся устаревшие записи
+
+	Args:
+		file_name (str): Название csv-файла
+		prof_name (str): Название профессии
+		quantiles (bool): Выводятся ли квантили окладов
+
+	Returns:
+		str: Ключ записи кэша
+	"""
+	import hashlib
+
+	info = os.stat(file_name)
+	code_version = hashlib.sha1()
+	for module in (__file__, *statistics_modules):
+		with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), module), 'rb') as file:
+			code_version.update(file.read())
+	source = hashlib.sha1(f'{os.path.abspath(file_name)}\0{prof_name}\0{quantiles:d}'.encode('utf-8')).hexdigest()[:16]
+	version = {'size': info.st_size, 'mtime': info.st_mtime_ns, 'fingerprint': get_file_fingerprint(file_name, info.st_size), 'rates': currency_to_rub, 'code': code_version.hexdigest()}
+	return f'{source}-{hashlib.sha1(json.dumps(version, sort_keys=True).encode("utf-8")).hexdigest()}'
+
+def load_cached_statistics(cache_key: str) -> list:
+	"""Загружает словари статистики из кэша и отмечает запись как недавно использованную
+
+	Args:
+		cache_key (str): Ключ записи кэша
+
+	Returns:
+		list or None: Аргументы show_statistics после prof_name или None, если записи нет
+	"""
+	path = os.path.join(statistics_cache_dir, cache_key)
+	try:
+		with open(f'{path}.json', 'r', encoding='utf-8') as file:
+			statistics = json.load(file)
+		os.utime(f'{path}.json')
+	except (OSError, ValueError):
+		return None
+
+	# словари хранятся списками пар, чтобы года остались int, а порядок ключей сохранился
+	return [dict(map(tuple, dict_object)) for dict_object in statistics[:6]] + [statistics[6] and {key: dict(map(tuple, value)) for key, value in statistics[6].items()}]
+
+def store_cached_statistics(cache_key: str, statistics: list) -> None:
+	"""Сохраняет словари статистики в кэш, удаляя устаревшие записи того же файла и профессии
+	и давно не использованные записи сверх statistics_cache_limit. Если кэш нельзя записать
+	(например, папка только для чтения), результат просто не сохраняется
+
+	Args:
+		cache_key (str): Ключ записи кэша
+		statistics (list): Аргументы show_statistics после prof_name
+	"""
+	path = os.path.join(statistics_cache_dir, cache_key)
+	quantiles = statistics[6] and {key: list(value.items()) for key, value in statistics[6].items()}
+	try:
+		os.makedirs(statistics_cache_dir, exist_ok=True)
+		source = cache_key.split('-')[0]
+		for name in os.listdir(statistics_cache_dir):
+			if name.startswith(f'{source}-') and not name.startswith(cache_key):
+				os.remove(os.path.join(statistics_cache_dir, name))
+
+		# запись идет во временный файл, чтобы параллельный запуск не прочитал его недописанным
+		with open(f'{path}.json.{os.getpid()}', 'w', encoding='utf-8') as file:
+			json.dump([list(dict_object.items()) for dict_object in statistics[:6]] + [quantiles], file, ensure_ascii=False)
+		os.replace(f'{path}.json.{os.getpid()}', f'{path}.json')
+		evict_cached_statistics()
+	except OSError:
+		pass
+
+def evict_cached_statistics(limit: int = statistics_cache_limit) -> None:
+	"""Удаляет из кэша статистики давно не использованные записи, пока его размер больше limit
+
+	Args:
+		limit (int): Максимальный размер кэша в байтах
+	"""
+	entries = {entry.path: entry.stat() for entry in os.scandir(statistics_cache_dir)}
+	total = sum(info.st_size for info in entries.values())
+	for path in sorted(entries, key=lambda path: entries[path].st_mtime):
+		if total <= limit:
+			break
+		os.remove(path)
+		total -= entries[path].st_size
+
+def print_incremental_statistics(file_name: str, prof_name: str, quantiles: bool = False) -> None:
+	"""Вычисляет статистику по csv-файлу, читая только строки, дописанные после предыдущего запуска (режим --cache).
+	Повторный запуск для неизмененного файла и той же профессии берет словари из кэша статистики и заново строит график
+
+	Args:
+		file_name (str): Название csv-файла
+		prof_name (str): Название профессии, для которой нужно подсчитать отдельную статистику
+		quantiles (bool): Нужно ли дополнительно вычислить квантили окладов (10%, медиана, 90%)
+	"""
+	if os.path.getsize(file_name) == 0:
+		return print('Пустой файл')
+	# если файл, профессия, курсы валют и код не менялись, словари берутся из кэша
+	cache_key = get_statistics_cache_key(file_name, prof_name, quantiles)
+	statistics = load_cached_statistics(cache_key)
+	if statistics is not None:
+		print_statistics_dictionaries(*statistics)
+		return Report(prof_name, *statistics).generate_image()
+	# в сжатый файл нельзя дописать строки и прочитать только их, а скетчи квантилей не хранятся в состоянии,
+	# поэтому в этих случаях файл каждый раз читается целиком
+	if quantiles or detect_compression(file_name):
+		return print_pipeline_statistics(file_name, prof_name, quantiles=quantiles, cache_key=cache_key)
+
+	state = update_statistics_state(file_name, [prof_name])
+	if state['rows'] == 0:
+		return print('Нет данных')
+
+	report_statistics(prof_name, state['total_data'], state['prof_data'][prof_name], state['cities'], state['rows'], cache_key=cache_key)
 
 def get_input2():
 	"""Запрашивает пользовательский ввод для формирования текстовой статистики
@@ -439,12 +2120,17 @@ def get_input2():
 		return print('Параметр сортировки некорректен')
 	if not reverse_sort in ('да', 'нет', ''):
 		return print('Порядок сортировки задан некорректно')
+	if sort_param and os.path.getsize(file_name) > sort_memory_limit:
+		sort_param = {v: k for k, v in table_fields.items()}[sort_param]
+		return print_vacancies_external(file_name, filter_, sort_param, reverse_sort == 'да', numbers_to_print, columns_to_print)
 	csv_data = csv_reader(file_name)
 	if isinstance(csv_data, str):
 		return print(csv_data)
 
 	sort_param = {v: k for k, v in table_fields.items()}[sort_param] if sort_param else ''
-	print_vacancies(csv_filer(*csv_data), filter_, sort_param, reverse_sort == 'да', numbers_to_print, columns_to_print)
+	vacancies_data = csv_lazy_filer(*csv_data)
+	index = load_skill_index(file_name, vacancies_data) if filter_[0] == 'skills' else None
+	print_vacancies(vacancies_data, filter_, sort_param, reverse_sort == 'да', numbers_to_print, columns_to_print, index)
 
 def get_input1():
 	"""Запрашивает пользовательский ввод для формирования файла визуальной статистики
@@ -452,21 +2138,44 @@ def get_input1():
 	file_name = input('Введите название файла: ')
 	prof_name = input('Введите название профессии: ')
 
-	csv_data = csv_reader(file_name)
-	if isinstance(csv_data, str):
-		return print(csv_data)
+	# python 222.py --sample[=размер] — быстрая оценка статистики по случайной выборке строк
+	sample = next((arg for arg in sys.argv if arg.split('=')[0] == '--sample'), None)
+	if sample:
+		return print_sample_statistics(file_name, prof_name, int(sample.split('=')[1]) if '=' in sample else sample_size)
+	# python 222.py --quantiles — вывод и график квантилей окладов рядом со средними
+	quantiles = '--quantiles' in sys.argv
+	# python 222.py --cache — состояние статистики и кэш результатов сохраняются рядом с файлом и в statistics_cache_dir,
+	# без него файл читается целиком и ничего не записывается
+	if '--cache' in sys.argv:
+		return print_incremental_statistics(file_name, prof_name, quantiles)
+	print_pipeline_statistics(file_name, prof_name, quantiles=quantiles)
+
+
+def get_input3():
+	"""Запрашивает пользовательский ввод для подсчета востребованных навыков
+	"""
+	file_name = input('Введите название файла: ')
+	prof_names = list(filter(None, input('Введите названия профессий: ').split(', ')))
 
-	print_statistics(csv_filer(*csv_data), prof_name)
+	print_skills_statistics(file_name, prof_names)
 
 
 def get_input():
 	"""Запрашивает пользовательский выбор результата работы программы
 	"""
-	choice = input('Вакансии или Стастистика: ')
+	choice = input('Вакансии, Стастистика или Навыки: ')
 	if choice == 'Вакансии':
 		return get_input2()
 	if choice == 'Статистика':
 		return get_input1()
+	if choice == 'Навыки':
+		return get_input3()
 
 
-print(doctest.testmod())
\ No newline at end of file
+if __name__ == '__main__':
+	# python 222.py --test — запуск doctest вместо программы
+	if '--test' in sys.argv:
+		import doctest
+		print(doctest.testmod())
+	else:
+		get_input()
@@ -1,5 +1,5 @@
 from datetime import datetime
-from time import time
+from profiler import Profiler
 
 class MyDateTime:
 	def __init__(self, datetime_str: str) -> None:
@@ -13,20 +13,15 @@ class MyDateTime:
 		year, month, day = (self).split('-')
 		return f'{day[:2]}.{month}.{year}'
 
-# декоратор для замеров времени выполнения
-def print_func_exec_time(func) -> None:
-	def wrapper(*args):
-		start = time()
-		func(*args)
-		print(f'Время выполнения функции \'{func.__name__}\': {time() - start}')
-	return wrapper
+# реестр для замеров времени выполнения
+timings = Profiler(enabled=True)
 
-@print_func_exec_time
+@timings.timer('str_to_datetime1')
 def str_to_datetime1(datetime_str: str) -> None:
 	for _ in range(1000):
 		datetime.strptime(datetime_str, '%Y-%m-%d %H:%M:%S.%f')
 
-@print_func_exec_time
+@timings.timer('str_to_datetime2')
 def str_to_datetime2(datetime_str: str) -> None:
 	for _ in range(1000):
 		MyDateTime(datetime_str)
@@ -34,8 +29,9 @@ def str_to_datetime2(datetime_str: str) -> None:
 time_to_test = str(datetime.now())
 str_to_datetime1(time_to_test)
 str_to_datetime2(time_to_test)
+timings.print_report()
 # придумал только 2 варианта
 #
 # Вывод:
-# Время выполнения функции 'str_to_datetime1': 0.025415658950805664
-# Время выполнения функции 'str_to_datetime2': 0.0049550533294677734
\ No newline at end of file
+# Время выполнения 'str_to_datetime1': 0.01222067 (1 вызовов)
+# Время выполнения 'str_to_datetime2': 0.002258852 (1 вызовов)
\ No newline at end of file
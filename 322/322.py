@@ -1,8 +1,7 @@
-import os
 from stats import *
-from multiprocessing import Process
 
 if __name__ == '__main__':
 	prof_name = input('Введите название профессии: ')
-	for file in os.listdir('C:/users/denisnumb/desktop/vacancies'):
-		Process(target=get_input, args=(f'C:/users/denisnumb/desktop/vacancies/{file}', prof_name)).start()
\ No newline at end of file
+	years = list(map(int, input('Введите диапазон лет (пусто — все годы): ').split()))
+	# открываются только файлы, годы которых попадают в диапазон; каждый обрабатывается в отдельном процессе
+	DataSet('C:/users/denisnumb/desktop/vacancies').scan(get_input, prof_name, years=(years[0], years[-1]) if years else None)
\ No newline at end of file
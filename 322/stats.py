@@ -1,17 +1,42 @@
-import csv
+import os
 import re
+import sys
 from itertools import islice
 from typing import List, Tuple
 from datetime import datetime
 import matplotlib.pyplot as plt
 import numpy as np
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import dataset
+from dataset import read_partition
+
 currency_to_rub = {'AZN': 35.68, 'BYR': 23.91, 'EUR': 59.9, 'GEL': 21.74, 'KGS': 0.76, 'KZT': 0.13, 'RUR': 1, 'UAH': 1.64, 'USD': 60.66, 'UZS': 0.0055}
 
-class DataSet:
-    def __init__(self, file_name, vacancies_objects, **kwargs):
-        self.file_name = file_name
-        self.vacancies_objects = vacancies_objects
+class DataSet(dataset.DataSet):
+    """Ленивый набор вакансий над папкой файлов-разделов (см. dataset.DataSet). Учитываются только записи
+    без пустых значений, так же как их читает csv_reader
+    """
+    complete = True
+
+    def __init__(self, file_name: str):
+        super().__init__(file_name)
+        self.__vacancies_objects = None
+
+    @property
+    def vacancies_objects(self) -> List['Vacancy']:
+        if self.__vacancies_objects is None:
+            self.__vacancies_objects = self.get_vacancies()
+        return self.__vacancies_objects
+
+    def get_vacancies(self, years: Tuple[int, int] = None) -> List['Vacancy']:
+        return [vacancy for vacancies in self.scan(load_partition, years, years=years) for vacancy in vacancies]
+
+    def print_statistics(self, prof_name: str, years: Tuple[int, int] = None) -> None:
+        vacancies = self.vacancies_objects if years is None else self.get_vacancies(years)
+        if len(vacancies) == 0:
+            return print('Нет данных')
+        print_statistics(vacancies, prof_name)
 
 class Vacancy:
     def __init__(self, name, salary, area_name, published_at, **kwargs):
@@ -45,15 +70,14 @@ class SalaryFloatItem(float):
 
 
 def csv_reader(file_name: str) -> Tuple[List[str], List[str]]:
-    with open(file_name, 'r', encoding='utf-8', newline='') as file:
-        titles = re.sub('\n|\r|\ufeff', '', file.readline()).split(',')
-        data = [elem for elem in list(csv.reader(file)) if all(map(lambda x: len(x) > 0, elem)) and len(elem) == len(titles)]
-       
-        file.seek(0)
-        if file.read() == '':
-            return 'Пустой файл'
-        if len(data) == 0:
-            return 'Нет данных'
+    # записи читаются по общему правилу read_partition (в том числе из сжатых файлов), статистике нужны записи без пустых значений
+    if os.path.getsize(file_name) == 0:
+        return 'Пустой файл'
+    rows = read_partition(file_name)
+    titles = next(rows)
+    data = [row for row in rows if all(row)]
+    if len(data) == 0:
+        return 'Нет данных'
 
     return titles, data
 
@@ -77,6 +101,16 @@ def csv_filer(titles: List[str], data: List[str]) -> List[Vacancy]:
 
     return vacancies_objects
 
+def load_partition(file_name: str, years: Tuple[int, int] = None) -> List[Vacancy]:
+    # те же записи, что учитывает манифест для DataSet.complete, то есть записи без пустых значений
+    csv_data = csv_reader(file_name)
+    if isinstance(csv_data, str):
+        return []
+    vacancies = csv_filer(*csv_data)
+    if years is None:
+        return vacancies
+    return [vacancy for vacancy in vacancies if years[0] <= vacancy.published_at.year <= years[1]]
+
 def add_data(dict_object: dict, key: str, average_salary: float, add_empty: bool) -> None:
     if add_empty:
         dict_object[key] = {'salary': [], 'count': 0}
@@ -1,25 +1,66 @@
 from urllib.request import urlopen
+from datetime import date, datetime, timedelta
 import xmltodict
 import json
+import os
+import sys
 
-currencies = ('USD', 'RUR', 'EUR', 'KZT', 'UAH', 'BYR')
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from rates import rates_file
 
-format_month = lambda month: str(month) if month >= 10 else f'0{month}'
+# коды валют ЦБ РФ для запроса динамики курса (рубль не запрашивается)
+currency_codes = {'USD': 'R01235', 'EUR': 'R01239', 'KZT': 'R01335', 'UAH': 'R01720', 'BYR': 'R01090'}
 
 def get_value(value: str, nominal: str) -> float:
     return int(nominal) * float(value.replace(',', '.'))
 
-def get_data( month: int, year: int) -> dict:
-    month = format_month(month)
-    raw_data = xmltodict.parse(urlopen(f'http://www.cbr.ru/scripts/XML_daily.asp?date_req=01/{month}/{year}').read())['ValCurs']['Valute']
+def get_dynamic(currency: str, start: date, end: date) -> dict:
+    # курсы валюты за все рабочие дни с start по end одним запросом
+    raw_data = xmltodict.parse(urlopen(f'http://www.cbr.ru/scripts/XML_dynamic.asp?date_req1={start:%d/%m/%Y}&date_req2={end:%d/%m/%Y}&VAL_NM_RQ={currency_codes[currency]}').read())['ValCurs']
+    records = raw_data.get('Record') or []
+    if isinstance(records, dict):
+        records = [records]
 
-    return {cur['CharCode']: get_value(cur['Value'], cur['Nominal']) for cur in raw_data if cur['CharCode'] in currencies}
+    return {datetime.strptime(record['@Date'], '%d.%m.%Y').date().isoformat(): get_value(record['Value'], record['Nominal']) for record in records}
 
-result = {}
+def get_missing_ranges(checked: list, start: date, end: date) -> list:
+    # дни, которые нужно запросить, чтобы проверенный диапазон кэша покрыл [start, end] и остался непрерывным
+    if not checked:
+        return [(start, end)]
+    first, last = date.fromisoformat(checked[0]), date.fromisoformat(checked[1])
+    ranges = []
+    if start < first:
+        ranges.append((start, first - timedelta(days=1)))
+    if end > last:
+        ranges.append((last + timedelta(days=1), end))
+    return ranges
 
-for year in range(2003, 2023):
-    for month in range(1, 13):
-        result[f'{year}-{format_month(month)}'] = get_data(month, year)
+def update_rates(start: date, end: date, file_name: str = rates_file) -> dict:
+    # дополняет кэш дневных курсов только недостающими днями и сохраняет его после каждой валюты
+    cache = {}
+    if os.path.exists(file_name):
+        with open(file_name, 'r', encoding='utf-8') as file:
+            cache = json.load(file)
 
-with open('result.json', 'w', encoding='utf-8') as file:
-    file.write(json.dumps(result, indent=4, ensure_ascii=False))
+    # будущие дни не отмечаются проверенными: курсы на них появятся позже
+    end = min(end, date.today())
+    for currency in currency_codes:
+        entry = cache.setdefault(currency, {'checked': None, 'rates': {}})
+        ranges = get_missing_ranges(entry['checked'], start, end)
+        for low, high in ranges:
+            entry['rates'].update(get_dynamic(currency, low, high))
+        if not ranges:
+            continue
+
+        # проверенный диапазон должен оставаться непрерывным
+        first = min([start] + ([date.fromisoformat(entry['checked'][0])] if entry['checked'] else []))
+        last = max([end] + ([date.fromisoformat(entry['checked'][1])] if entry['checked'] else []))
+        entry['checked'] = [first.isoformat(), last.isoformat()]
+        entry['rates'] = dict(sorted(entry['rates'].items()))
+        with open(file_name, 'w', encoding='utf-8') as file:
+            json.dump(cache, file, indent=4, ensure_ascii=False)
+
+    return cache
+
+if __name__ == '__main__':
+    update_rates(date(2003, 1, 1), date(2022, 12, 31))
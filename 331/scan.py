@@ -0,0 +1,111 @@
+from stats import *
+from abc import ABC, abstractmethod
+import json
+
+
+class Accumulator(ABC):
+	"""Базовый класс анализа, который получает вакансии по одной за общий проход по файлу.
+	Анализ без add или result нельзя создать, поэтому он не дойдет до регистрации
+	"""
+	@abstractmethod
+	def add(self, vacancy: Vacancy):
+		pass
+
+	@abstractmethod
+	def result(self):
+		pass
+
+class RowCount(Accumulator):
+	"""Количество вакансий
+	"""
+	def __init__(self):
+		self.count = 0
+
+	def add(self, vacancy: Vacancy):
+		self.count += 1
+
+	def result(self) -> int:
+		return self.count
+
+class NullSalaryCount(Accumulator):
+	"""Количество вакансий без нижней и верхней границ оклада
+	"""
+	def __init__(self):
+		self.count = 0
+
+	def add(self, vacancy: Vacancy):
+		if not vacancy.salary.salary_from and not vacancy.salary.salary_to:
+			self.count += 1
+
+	def result(self) -> int:
+		return self.count
+
+class CurrencyCountByYear(Accumulator):
+	"""Количество вакансий в каждой валюте по годам
+	"""
+	def __init__(self):
+		self.currencies = {}
+
+	def add(self, vacancy: Vacancy):
+		currency = vacancy.salary.salary_currency
+		if not currency:
+			return
+
+		year = vacancy.published_at.year
+		if year not in self.currencies.keys():
+			self.currencies[year] = {}
+		if currency not in self.currencies[year].keys():
+			self.currencies[year][currency] = 0
+
+		self.currencies[year][currency] += 1
+
+	def result(self) -> dict:
+		return self.currencies
+
+class PublishedRange(Accumulator):
+	"""Самая старая и самая новая вакансии по дате публикации
+	"""
+	def __init__(self):
+		self.oldest_vacancy = None
+		self.newest_vacancy = None
+
+	def add(self, vacancy: Vacancy):
+		if not self.oldest_vacancy or vacancy.published_at < self.oldest_vacancy.published_at:
+			self.oldest_vacancy = vacancy
+		if not self.newest_vacancy or vacancy.published_at > self.newest_vacancy.published_at:
+			self.newest_vacancy = vacancy
+
+	def result(self) -> tuple:
+		return self.oldest_vacancy, self.newest_vacancy
+
+class ScanEngine:
+	"""Выполняет все зарегистрированные анализы за один потоковый проход по csv-файлу
+	"""
+	def __init__(self):
+		self.accumulators = {}
+
+	def register(self, name: str, accumulator: Accumulator) -> 'ScanEngine':
+		self.accumulators[name] = accumulator
+		return self
+
+	def run(self, file_name: str) -> dict:
+		accumulators = list(self.accumulators.values())
+		for vacancy in iter_vacancies(file_name):
+			for accumulator in accumulators:
+				accumulator.add(vacancy)
+
+		return {name: accumulator.result() for name, accumulator in self.accumulators.items()}
+
+
+if __name__ == '__main__':
+	results = ScanEngine() \
+		.register('rows', RowCount()) \
+		.register('null_salaries', NullSalaryCount()) \
+		.register('currencies', CurrencyCountByYear()) \
+		.register('published_range', PublishedRange()) \
+		.run('vacancies_dif_currencies.csv')
+
+	oldest_vacancy, newest_vacancy = results['published_range']
+	print(f'Количество вакансий: {results["rows"]}\nВакансий без оклада: {results["null_salaries"]}')
+	print(f'Дата публикации самой старой вакансии: {oldest_vacancy.published_at}\nДата публикации самой новой вакансии: {newest_vacancy.published_at}')
+	print(json.dumps(results['currencies'], indent=4, ensure_ascii=False))
@@ -1,12 +1,24 @@
 import csv
+import os
 import re
-from typing import List
+import sys
+from typing import List, Tuple
 from datetime import datetime
 
-class DataSet:
-	def __init__(self, file_name, vacancies_objects):
-		self.file_name = file_name
-		self.vacancies_objects = vacancies_objects
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import dataset
+from dataset import read_partition
+from decompress import open_text
+
+class DataSet(dataset.DataSet):
+	"""Ленивый набор вакансий над папкой файлов-разделов (см. dataset.DataSet), который читает вакансии по одной
+	"""
+	def iter_vacancies(self, years: Tuple[int, int] = None):
+		# читает вакансии выбранных файлов по одной
+		for file_name in self.partitions(years):
+			for vacancy in iter_vacancies(file_name):
+				if years is None or years[0] <= vacancy.published_at.year <= years[1]:
+					yield vacancy
 
 class Vacancy:
 	def __init__(self, name, salary, area_name, published_at):
@@ -30,19 +42,24 @@ def format_value(dict_object: dict, key: str, value: str):
 
 
 def csv_reader(file_name: str):
-	with open(file_name, 'r', encoding='utf-8', newline='') as file:
+	with open_text(file_name) as file:
 		return re.sub('\n|\r|\ufeff', '', file.readline()).split(','), list(csv.reader(file))
 
-def csv_filer(titles: list, data: list):
-	vacancies_objects = []
+def create_vacancy(titles: list, vacancy_data: list):
+	vacancy = {key: None for key in ('name', 'area_name', 'published_at')}
+	salary = {key: None for key in ('salary_from', 'salary_to', 'salary_currency')}
+	for key, value in zip(titles, vacancy_data):
+		format_value(salary if 'salary' in key else vacancy, key, value)
 
-	for vacancy_data in data:
-		vacancy = {key: None for key in ('name', 'area_name', 'published_at')}
-		salary = {key: None for key in ('salary_from', 'salary_to', 'salary_currency')}
-		for key, value in zip(titles, vacancy_data):
-			format_value(salary if 'salary' in key else vacancy, key, value)
+	vacancy['salary'] = Salary(**salary)
+	return Vacancy(**vacancy)
 
-		vacancy['salary'] = Salary(**salary)
-		vacancies_objects.append(Vacancy(**vacancy))
+def csv_filer(titles: list, data: list):
+	return [create_vacancy(titles, vacancy_data) for vacancy_data in data]
 
-	return vacancies_objects
+# читает вакансии по одной, не храня весь файл в памяти; пустые и обрезанные строки пропускаются (см. read_partition)
+def iter_vacancies(file_name: str):
+	rows = read_partition(file_name)
+	titles = next(rows)
+	for vacancy_data in rows:
+		yield create_vacancy(titles, vacancy_data)
@@ -1,17 +1,25 @@
 from stats import *
 import pandas as pd
-import json
+import numpy as np
+import os
+import sys
 
-format_month = lambda month: str(month) if month >= 10 else f'0{month}'
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from profiler import profiler
+from rates import load_rate_index
 
-with open('currency_by_years.json', 'r') as file:
-    cur_multipliers = json.load(file)
+# дневные курсы currency_rates.json, а если их нет — курсы на 1-е число месяца из currency_by_years.json
+rate_index = load_rate_index()
 
-data: List[Vacancy] = csv_filer(*csv_reader('vacancies_dif_currencies.csv'))
+with profiler.timer('parsing'):
+    data: List[Vacancy] = csv_filer(*csv_reader('vacancies_dif_currencies.csv'))
+
+# курсы на даты публикации ищутся сразу для всей колонки
+multipliers = rate_index.multipliers([vacancy.salary.salary_currency for vacancy in data], [vacancy.published_at for vacancy in data])
 
 result = []
 
-for vacancy in data:
+for vacancy, multiplier in zip(data, multipliers):
     if not vacancy.salary.salary_from and not vacancy.salary.salary_to:
         continue
 
@@ -24,16 +32,11 @@ for vacancy in data:
     elif not vacancy.salary.salary_from and vacancy.salary.salary_to:
         salary = float(vacancy.salary.salary_to)
 
-    cur = vacancy.salary.salary_currency
-    date_key = f'{vacancy.published_at.year}-{format_month(vacancy.published_at.month)}'
+    if np.isnan(multiplier):
+        profiler.count('rows_skipped_missing_rate')
+        continue
 
-    if cur and cur != 'RUR':
-        if cur not in cur_multipliers[date_key].keys():
-            continue
-        if not cur_multipliers[date_key][cur]:
-            continue
-        
-        salary *= cur_multipliers[date_key][cur]
+    salary *= multiplier
 
     result.append({'name': vacancy.name, 'salary': salary, 'area_name': vacancy.area_name, 'published_at': str(vacancy.published_at)})
 
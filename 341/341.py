@@ -1,50 +1,26 @@
 import pandas as pd
 from pandas import isnull, notnull
-from datetime import datetime
-import json
+import os
+import sys
 
-format_month = lambda month: str(month) if month >= 10 else f'0{month}'
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from profiler import profiler
+from rates import load_rate_index
 
-with open('currency_by_years.json', 'r') as file:
-    cur_multipliers = json.load(file)
+# дневные курсы currency_rates.json, а если их нет — курсы на 1-е число месяца из currency_by_years.json
+rate_index = load_rate_index()
 
-data: pd.DataFrame = pd.read_csv('vacancies_dif_currencies.csv')[:100]
+with profiler.timer('parsing'):
+    data: pd.DataFrame = pd.read_csv('vacancies_dif_currencies.csv')[:100]
 
-salary_values = []
+# вакансии без оклада удаляются; если указана одна граница, оклад равен ей, иначе — среднему границ
+data = data[notnull(data['salary_from']) | notnull(data['salary_to'])]
+salary_values = data[['salary_from', 'salary_to']].mean(axis=1)
 
-columns = ('salary_from', 'salary_to', 'salary_currency', 'published_at')
-
-for index, (salary_from, salary_to, salary_currency, published_at) in enumerate(zip(*[data[c] for c in columns])):
-    if isnull(salary_from) and isnull(salary_to):
-        data = data.drop(index=index)
-        continue
-
-    salary = 0
-
-    if notnull(salary_from) and notnull(salary_to):
-        salary = (salary_from + salary_to) / 2
-    elif notnull(salary_from) and isnull(salary_to):
-        salary = salary_from
-    elif isnull(salary_from) and notnull(salary_to):
-        salary = salary_to
-
-    published_at = datetime.strptime(published_at, '%Y-%m-%dT%H:%M:%S+%f')
-    date_key = f'{published_at.year}-{format_month(published_at.month)}'
-
-    if notnull(salary_currency) and salary_currency != 'RUR':
-        if salary_currency not in cur_multipliers[date_key].keys():
-            data = data.drop(index=index)
-            continue
-        if not cur_multipliers[date_key][salary_currency]:
-            data = data.drop(index=index)
-            continue
-        
-        salary *= cur_multipliers[date_key][salary_currency]
-
-    salary_values.append(salary)
-
-    if len(salary_values) == 100:
-        break
+# курсы на даты публикации ищутся сразу для всей колонки; вакансии без курса на дату публикации удаляются
+multipliers = rate_index.multipliers(data['salary_currency'], data['published_at'])
+profiler.count('rows_skipped_missing_rate', int(isnull(multipliers).sum()))
+data, salary_values = data[notnull(multipliers)], (salary_values * multipliers)[notnull(multipliers)]
 
 data.insert(2, 'salary', salary_values)
 for column in ('salary_from', 'salary_to', 'salary_currency'):
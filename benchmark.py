@@ -0,0 +1,297 @@
+import argparse
+import contextlib
+import csv
+import importlib.util
+import io
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from time import perf_counter
+
+root = os.path.dirname(os.path.abspath(__file__))
+
+names = ['Программист Python', 'Java разработчик', 'Аналитик', 'Аналитик данных', 'Системный аналитик', 'Frontend-разработчик', 'Тестировщик', 'Менеджер проектов', 'Дизайнер', 'DevOps инженер', 'Инженер-программист 1С', 'Оператор call-центра']
+areas = ['Москва', 'Санкт-Петербург', 'Новосибирск', 'Екатеринбург', 'Казань', 'Нижний Новгород', 'Самара', 'Краснодар', 'Минск', 'Алматы', 'Киев', 'Ташкент', 'Баку', 'Тбилиси', 'Бишкек', 'Воронеж', 'Пермь', 'Уфа', 'Томск', 'Омск']
+area_weights = [30, 12] + [3] * 18
+skills = ['Python', 'SQL', 'Git', 'Linux', 'Docker', 'Kubernetes', 'Java', 'Spring', 'JavaScript', 'React', 'Excel', 'PostgreSQL', 'Django', 'REST', 'Английский язык', '1С', 'Tableau', 'Jira']
+employers = [f'Компания {i}' for i in range(1, 2001)]
+experiences = ['noExperience', 'between1And3', 'between3And6', 'moreThan6']
+currencies = ['RUR', 'USD', 'EUR', 'KZT', 'UAH', 'BYR', 'AZN', 'GEL', 'KGS', 'UZS']
+currency_weights = [80, 8, 3, 3, 2, 1, 1, 1, 0.5, 0.5]
+paragraphs = [
+	'Мы ищем в команду <strong>опытного специалиста</strong>, готового развиваться вместе с нами.',
+	'Работа над высоконагруженным сервисом&nbsp;с миллионами пользователей.',
+	'<em>Гибкий график</em>, возможность удаленной работы, ДМС с первого месяца.',
+	'Участие в проектировании архитектуры, код-ревью и наставничество.',
+	'Официальное трудоустройство по ТК РФ, белая заработная плата.'
+]
+titles = ['name', 'description', 'key_skills', 'experience_id', 'premium', 'employer_name', 'salary_from', 'salary_to', 'salary_gross', 'salary_currency', 'area_name', 'published_at']
+# формат vacancies_dif_currencies.csv, который читают скрипты 332 и 341
+dif_currencies_titles = ['name', 'salary_from', 'salary_to', 'salary_currency', 'area_name', 'published_at']
+cases = ['startup', 'csv_reader', 'csv_filer', 'print_statistics', 'print_vacancies', 'pipeline', 'shared_queries', '332', '341']
+# модули, которые не должны импортироваться при запуске 222.py
+heavy_modules = ['matplotlib', 'numpy', 'prettytable', 'pandas', 'doctest']
+startup_command = "import importlib.util as u; s = u.spec_from_file_location('vacancies', {path!r}); s.loader.exec_module(u.module_from_spec(s))"
+
+def generate_description(rand: random.Random) -> str:
+	"""Генерирует HTML-описание вакансии из нескольких абзацев и списков, разделенных \\r\\n
+
+	Args:
+		rand (random.Random): Генератор случайных чисел
+
+	Returns:
+		str: Описание вакансии
+	"""
+	parts = []
+	for _ in range(rand.randint(2, 6)):
+		parts.append(f'<p>{rand.choice(paragraphs)}</p>')
+		if rand.random() < 0.5:
+			parts.append('<ul>' + '\r\n'.join(f'<li>{rand.choice(paragraphs)}</li>' for _ in range(rand.randint(2, 5))) + '</ul>')
+	return '\r\n'.join(parts)
+
+def generate_vacancies(file_name: str, rows: int, seed: int = 0, columns: list = titles) -> None:
+	"""Детерминированно генерирует csv-файл вакансий в формате выгрузки hh.ru: HTML-описания,
+	многострочные навыки и описания, разные валюты и частично незаполненные оклады
+
+	Args:
+		file_name (str): Название csv-файла
+		rows (int): Количество строк
+		seed (int): Зерно генератора случайных чисел
+		columns (list): Колонки, которые нужно записать (при одном seed значения совпадают для любого набора колонок)
+	"""
+	indexes = [titles.index(column) for column in columns]
+	rand = random.Random(seed)
+	start = datetime(2003, 1, 1)
+	period = int((datetime(2022, 12, 31) - start).total_seconds())
+
+	with open(file_name, 'w', encoding='utf-8-sig', newline='') as file:
+		writer = csv.writer(file)
+		writer.writerow(columns)
+		for _ in range(rows):
+			salary_from = rand.randrange(10, 300) * 1000 if rand.random() < 0.85 else ''
+			salary_to = (salary_from or rand.randrange(10, 300) * 1000) + rand.randrange(0, 100) * 1000 if rand.random() < 0.7 else ''
+			salary_currency = rand.choices(currencies, currency_weights)[0] if salary_from or salary_to else ''
+			row = [
+				rand.choice(names),
+				generate_description(rand),
+				'\n'.join(rand.sample(skills, rand.randint(1, 6))),
+				rand.choice(experiences),
+				'True' if rand.random() < 0.05 else 'False',
+				rand.choice(employers),
+				salary_from,
+				salary_to,
+				rand.choice(['True', 'False']) if salary_currency else '',
+				salary_currency,
+				rand.choices(areas, area_weights)[0],
+				(start + timedelta(seconds=rand.randrange(period))).strftime('%Y-%m-%dT%H:%M:%S+0300')
+			]
+			writer.writerow([row[index] for index in indexes])
+
+def load_module(path: str):
+	"""Загружает скрипт как модуль (имена вроде 222.py нельзя импортировать обычным import)
+
+	Args:
+		path (str): Путь к скрипту
+
+	Returns:
+		module: Загруженный модуль
+	"""
+	spec = importlib.util.spec_from_file_location(os.path.splitext(os.path.basename(path))[0], path)
+	module = importlib.util.module_from_spec(spec)
+	# процессы конвейера получают функции модуля по имени, поэтому модуль должен быть в sys.modules
+	sys.modules[spec.name] = module
+	with contextlib.redirect_stdout(io.StringIO()):
+		spec.loader.exec_module(module)
+	return module
+
+def run_case(case: str, file_name: str) -> dict:
+	"""Выполняет один замер в текущем процессе (вызывается в дочернем процессе).
+	Этапы, предшествующие замеряемому, выполняются заранее и не входят во время
+
+	Args:
+		case (str): Название замера
+		file_name (str): Название csv-файла
+
+	Returns:
+		dict: Время выполнения замеряемого этапа в секундах
+	"""
+	stats = load_module(os.path.join(root, '222.py'))
+	data = None if case in ('csv_reader', 'pipeline') else stats.csv_reader(file_name)
+	vacancies = stats.csv_filer(*data) if case in ('print_statistics', 'shared_queries') else None
+	# режим таблицы, как и get_input2, работает с вакансиями, поля которых разбираются при обращении
+	lazy_vacancies = stats.csv_lazy_filer(*data) if case == 'print_vacancies' else None
+	steps = {
+		'csv_reader': lambda: stats.csv_reader(file_name),
+		'csv_filer': lambda: stats.csv_filer(*data),
+		'print_statistics': lambda: stats.print_statistics(vacancies, 'Аналитик'),
+		'print_vacancies': lambda: stats.print_vacancies(lazy_vacancies, ['area_name', 'Москва'], 'salary', True, [0, 20], ['Название', 'Оклад', 'Название региона']),
+		'pipeline': lambda: stats.print_pipeline_statistics(file_name, 'Аналитик'),
+		'shared_queries': lambda: stats.get_parallel_statistics(vacancies, ['Аналитик', 'Программист', 'Дизайнер', 'Менеджер'])
+	}
+
+	start = perf_counter()
+	with contextlib.redirect_stdout(io.StringIO()):
+		steps[case]()
+	return {'seconds': perf_counter() - start}
+
+def measure(case: str, file_name: str, work_dir: str) -> dict:
+	"""Выполняет замер в отдельном процессе, чтобы пиковое потребление памяти относилось только к нему.
+	Скрипты 332 и 341 запускаются целиком, их время включает запуск интерпретатора и импорты
+
+	Args:
+		case (str): Название замера
+		file_name (str): Название csv-файла
+		work_dir (str): Рабочая папка с vacancies_dif_currencies.csv и currency_by_years.json
+
+	Returns:
+		dict: Время выполнения в секундах и пиковое потребление памяти в МБ (None, если ОС не сообщает его)
+	"""
+	env = dict(os.environ, MPLBACKEND='Agg', PYTHONPATH=os.path.join(root, '331'))
+	command = [sys.executable, os.path.join(root, case, f'{case}.py')] if case in ('332', '341') else [sys.executable, __file__, file_name, '--case', case]
+	shutil.copy(os.path.join(root, '341' if case == '341' else '331', 'currency_by_years.json'), work_dir)
+
+	with tempfile.TemporaryFile() as output:
+		start = perf_counter()
+		process = subprocess.Popen(command, cwd=work_dir, env=env, stdout=output, stderr=subprocess.STDOUT)
+		if hasattr(os, 'wait4'):
+			_, status, usage = os.wait4(process.pid, 0)
+			process.returncode = os.waitstatus_to_exitcode(status)
+			# ru_maxrss — в КБ на Linux и в байтах на macOS
+			rss = usage.ru_maxrss / (1024 ** 2 if sys.platform == 'darwin' else 1024)
+		else:
+			process.wait()
+			rss = None
+		seconds = perf_counter() - start
+		output.seek(0)
+		log = output.read().decode('utf-8', 'replace')
+
+	if process.returncode != 0:
+		return {'error': log.strip().splitlines()[-1] if log.strip() else f'код возврата {process.returncode}'}
+	if case not in ('332', '341'):
+		seconds = json.loads(log.strip().splitlines()[-1])['seconds']
+	return {'seconds': seconds, 'rss_mb': rss}
+
+def measure_startup(repeat: int = 20) -> dict:
+	"""Замеряет время запуска 222.py (импорт модуля без выполнения программы) в отдельных процессах
+	и разбирает отчет python -X importtime
+
+	Args:
+		repeat (int): Количество запусков; в результат идет минимальное время
+
+	Returns:
+		dict: Время запуска в секундах, суммарное время импортов в мс, самые долгие импорты и тяжелые модули, попавшие в запуск
+	"""
+	command = [sys.executable, '-c', startup_command.format(path=os.path.join(root, '222.py'))]
+	seconds = []
+	for _ in range(repeat):
+		start = perf_counter()
+		subprocess.run(command, cwd=root, check=True, capture_output=True)
+		seconds.append(perf_counter() - start)
+
+	# строки вида "import time:  self [us] | cumulative | imported package"
+	report = subprocess.run([sys.executable, '-X', 'importtime'] + command[1:], cwd=root, check=True, capture_output=True, text=True).stderr
+	imports = []
+	for line in report.splitlines()[1:]:
+		self_us, cumulative_us, module = line.split(':', 1)[1].split('|')
+		imports.append((int(self_us), int(cumulative_us), module.rstrip()))
+
+	top_level = sorted((item for item in imports if not item[2].startswith('  ')), key=lambda item: item[1], reverse=True)
+	return {
+		'seconds': min(seconds),
+		'rss_mb': None,
+		'import_ms': sum(self_us for self_us, _, _ in imports) / 1000,
+		'slowest_imports': {module.strip(): cumulative_us / 1000 for _, cumulative_us, module in top_level[:5]},
+		'heavy_modules': sorted({module.strip().split('.')[0] for _, _, module in imports} & set(heavy_modules))
+	}
+
+def compare(results: dict, baseline: dict, tolerance: float) -> bool:
+	"""Выводит сравнение результатов с сохраненным эталоном
+
+	Args:
+		results (dict): Результаты замеров
+		baseline (dict): Результаты эталонного запуска
+		tolerance (float): Допустимое относительное замедление
+
+	Returns:
+		bool: Есть ли замеры, замедлившиеся больше допустимого
+	"""
+	regressed = False
+	for case, result in results.items():
+		base = baseline.get(case)
+		if not base or 'seconds' not in result or 'seconds' not in base:
+			continue
+		ratio = result['seconds'] / base['seconds']
+		regressed |= ratio > 1 + tolerance
+		print(f'{case:<18} {base["seconds"]:>9.2f} с -> {result["seconds"]:>9.2f} с ({ratio:.2f}x){"  ЗАМЕДЛЕНИЕ" if ratio > 1 + tolerance else ""}')
+	return regressed
+
+def main():
+	parser = argparse.ArgumentParser(description='Замеры конвейера чтение → формирование вакансий → статистика → вывод таблицы на синтетических данных')
+	parser.add_argument('file', nargs='?', help='csv-файл для замера (по умолчанию генерируется)')
+	parser.add_argument('--case', choices=cases, help=argparse.SUPPRESS)
+	parser.add_argument('--rows', type=int, default=1_000_000, help='количество строк генерируемого файла')
+	parser.add_argument('--seed', type=int, default=0, help='зерно генератора данных')
+	parser.add_argument('--dir', default=tempfile.gettempdir(), help='папка для сгенерированных файлов')
+	parser.add_argument('--cases', nargs='+', choices=cases, default=cases, help='замеры, которые нужно выполнить')
+	parser.add_argument('--baseline', default=os.path.join(root, 'benchmark_baseline.json'), help='файл эталонных результатов')
+	parser.add_argument('--save-baseline', action='store_true', help='сохранить результаты как эталон')
+	parser.add_argument('--tolerance', type=float, default=0.1, help='допустимое замедление относительно эталона')
+	args = parser.parse_args()
+
+	if args.case:
+		return print(json.dumps(run_case(args.case, args.file)))
+
+	file_name = args.file or os.path.join(args.dir, f'vacancies_{args.rows}_{args.seed}.csv')
+	dif_currencies_file_name = args.file or os.path.join(args.dir, f'vacancies_dif_currencies_{args.rows}_{args.seed}.csv')
+	for name, columns in ((file_name, titles), (dif_currencies_file_name, dif_currencies_titles)):
+		if not os.path.exists(name):
+			print(f'Генерация {name}...')
+			generate_vacancies(name, args.rows, args.seed, columns)
+	size_mb = os.path.getsize(file_name) / 1024 ** 2
+	with open(file_name, 'r', encoding='utf-8-sig', newline='') as file:
+		rows = sum(1 for _ in csv.reader(file)) - 1
+
+	results = {}
+	with tempfile.TemporaryDirectory() as work_dir:
+		shutil.copy(dif_currencies_file_name, os.path.join(work_dir, 'vacancies_dif_currencies.csv'))
+		print(f'{"замер":<18} {"время":>11} {"строк/с":>12} {"МБ/с":>8} {"пик RSS":>10}')
+		for case in args.cases:
+			if case == 'startup':
+				result = results[case] = measure_startup()
+				print(f'{case:<18} {result["seconds"]:>9.3f} с, импорты {result["import_ms"]:.1f} мс, самые долгие: {result["slowest_imports"]}')
+				if result['heavy_modules']:
+					print(f'{"":<18} при запуске импортируются тяжелые модули: {", ".join(result["heavy_modules"])}')
+				continue
+			result = results[case] = measure(case, os.path.abspath(file_name), work_dir)
+			if 'error' in result:
+				print(f'{case:<18} ошибка: {result["error"]}')
+				continue
+			rss = f'{result["rss_mb"]:.0f} МБ' if result['rss_mb'] is not None else '—'
+			print(f'{case:<18} {result["seconds"]:>9.2f} с {rows / result["seconds"]:>12.0f} {size_mb / result["seconds"]:>8.1f} {rss:>10}')
+
+	results = {'rows': rows, 'results': results}
+	if args.save_baseline:
+		with open(args.baseline, 'w', encoding='utf-8') as file:
+			json.dump(results, file, indent=4, ensure_ascii=False)
+		return
+
+	# тяжелые модули при запуске 222.py считаются регрессией независимо от эталона
+	regressed = bool(results['results'].get('startup', {}).get('heavy_modules'))
+	if os.path.exists(args.baseline):
+		with open(args.baseline, 'r', encoding='utf-8') as file:
+			baseline = json.load(file)
+		if baseline['rows'] != rows:
+			print(f'Эталон снят на {baseline["rows"]} строках, сравнение пропущено')
+		else:
+			print('\nСравнение с эталоном:')
+			regressed |= compare(results['results'], baseline['results'], args.tolerance)
+	if regressed:
+		sys.exit(1)
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,156 @@
+import csv
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterator, List, Tuple
+
+from decompress import extensions, open_text
+
+# манифест папки с файлами-разделами: диапазон лет, количество строк, размер и время изменения каждого файла
+manifest_name = 'manifest.json'
+# версия записей манифеста: записи другой версии пересчитываются
+manifest_version = 2
+
+
+def is_partition(name: str) -> bool:
+	"""Проверяет, является ли файл папки csv-файлом раздела (в том числе сжатым)
+
+	Args:
+		name (str): Название файла
+
+	Returns:
+		bool: Является ли файл разделом
+
+	>>> [is_partition(name) for name in ('2022.csv', '2022.csv.gz', '2022.csv.stats.json', '2022.csv.index.json', 'manifest.json')]
+	[True, True, False, False, False]
+	"""
+	return any(name.lower().endswith(f'.csv{extension}') for extension in ('', *extensions))
+
+def read_partition(file_name: str) -> Iterator[List[str]]:
+	"""Читает строки файла-раздела по одной. Строка считается записью, если в ней столько же значений, сколько заголовков,
+	и дата публикации начинается с года: пустые и обрезанные строки (например, от записи csv без newline='' в Windows)
+	пропускаются. Первым значением возвращаются заголовки
+
+	Args:
+		file_name (str): Название csv-файла
+
+	Yields:
+		List[str]: Заголовки, затем значения записей
+	"""
+	with open_text(file_name) as file:
+		titles = re.sub('\n|\r|\ufeff', '', file.readline()).split(',')
+		yield titles
+		if 'published_at' not in titles:
+			return
+		column = titles.index('published_at')
+		for row in csv.reader(file):
+			if len(row) == len(titles) and row[column][:4].isdigit():
+				yield row
+
+def scan_partition(file_name: str) -> dict:
+	"""Собирает запись манифеста для файла-раздела
+
+	Args:
+		file_name (str): Название csv-файла
+
+	Returns:
+		dict: Диапазон лет, количество записей ('rows'), количество записей без пустых значений ('complete_rows'),
+			размер и время изменения файла
+	"""
+	info = os.stat(file_name)
+	rows = read_partition(file_name)
+	titles = next(rows)
+	column = titles.index('published_at') if 'published_at' in titles else None
+	years, complete_rows = [], 0
+	for row in rows:
+		years.append(int(row[column][:4]))
+		complete_rows += all(row)
+	return {'version': manifest_version, 'years': [min(years), max(years)] if years else None, 'rows': len(years), 'complete_rows': complete_rows,
+		'size': info.st_size, 'mtime': info.st_mtime_ns}
+
+
+class DataSet:
+	"""Ленивый набор вакансий над папкой csv-файлов (в том числе сжатых), разбитых по годам, как их сохраняет 321.py.
+	Файлы читаются только по запросу; запрос с диапазоном лет открывает только файлы, годы которых пересекаются
+	с диапазоном (по манифесту), а выбранные файлы обрабатываются параллельно в процессах
+
+	Attributes:
+		file_name (str): Папка с файлами-разделами
+		manifest (dict): Записи манифеста по названиям файлов
+		complete (bool): Учитываются только записи без пустых значений (так их читают скрипты статистики)
+	"""
+	complete = False
+
+	def __init__(self, file_name: str):
+		"""Конструктор класса
+
+		Args:
+			file_name (str): Папка с файлами-разделами
+		"""
+		self.file_name = file_name
+		self.manifest = self.__load_manifest()
+
+	def __load_manifest(self) -> dict:
+		"""Приватный метод загрузки манифеста: записи пересчитываются только для новых и измененных файлов
+
+		Returns:
+			dict: Записи манифеста по названиям файлов
+		"""
+		path = os.path.join(self.file_name, manifest_name)
+		manifest = {}
+		if os.path.exists(path):
+			with open(path, 'r', encoding='utf-8') as file:
+				manifest = json.load(file)
+
+		files = sorted(name for name in os.listdir(self.file_name) if is_partition(name))
+		stale = [name for name in files if manifest.get(name, {}).get('version') != manifest_version
+			or manifest[name]['mtime'] != os.stat(os.path.join(self.file_name, name)).st_mtime_ns
+			or manifest[name]['size'] != os.path.getsize(os.path.join(self.file_name, name))]
+		if stale or len(manifest) != len(files):
+			with ProcessPoolExecutor() as executor:
+				manifest.update(zip(stale, executor.map(scan_partition, [os.path.join(self.file_name, name) for name in stale])))
+			manifest = {name: manifest[name] for name in files}
+			with open(path, 'w', encoding='utf-8') as file:
+				json.dump(manifest, file, indent=4)
+		return manifest
+
+	def partitions(self, years: Tuple[int, int] = None) -> List[str]:
+		"""Возвращает файлы, в которых есть записи за диапазон лет
+
+		Args:
+			years (Tuple[int, int]): Первый и последний год включительно (None — все годы)
+
+		Returns:
+			List[str]: Пути к файлам
+		"""
+		rows = 'complete_rows' if self.complete else 'rows'
+		return [os.path.join(self.file_name, name) for name, partition in self.manifest.items()
+			if partition[rows] and (years is None or partition['years'][0] <= years[1] and partition['years'][1] >= years[0])]
+
+	def rows(self, years: Tuple[int, int] = None) -> int:
+		"""Возвращает количество записей в файлах, которые будут открыты для диапазона лет
+
+		Args:
+			years (Tuple[int, int]): Первый и последний год включительно (None — все годы)
+
+		Returns:
+			int: Количество записей
+		"""
+		rows = 'complete_rows' if self.complete else 'rows'
+		return sum(self.manifest[os.path.basename(file_name)][rows] for file_name in self.partitions(years))
+
+	def scan(self, function: Callable, *args, years: Tuple[int, int] = None, executor=ProcessPoolExecutor) -> list:
+		"""Выполняет function(file_name, *args) параллельно для каждого файла диапазона лет
+
+		Args:
+			function (Callable): Функция обработки файла (должна сериализоваться pickle)
+			years (Tuple[int, int]): Первый и последний год включительно (None — все годы)
+			executor (type): Класс пула исполнителей
+
+		Returns:
+			list: Результаты function в порядке файлов
+		"""
+		files = self.partitions(years)
+		with executor() as pool:
+			return list(pool.map(function, files, *[[arg] * len(files) for arg in args]))
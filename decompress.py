@@ -0,0 +1,300 @@
+import io
+import os
+import queue
+import re
+import threading
+# mmap и concurrent.futures импортируются внутри методов распаковки: так чтение несжатого файла их не ждет
+
+# сигнатуры начала члена (gzip member, bz2/xz stream, zstd frame) для определения формата и разбиения файла
+magic_numbers = {'gzip': b'\x1f\x8b\x08', 'bz2': b'BZh', 'xz': b'\xfd7zXZ\x00', 'zstd': b'\x28\xb5\x2f\xfd'}
+member_patterns = {compression: re.compile(re.escape(magic)) for compression, magic in magic_numbers.items()}
+member_patterns['bz2'] = re.compile(b'BZh[1-9]1AY&SY')
+extensions = {'.gz': 'gzip', '.gzip': 'gzip', '.bz2': 'bz2', '.xz': 'xz', '.zst': 'zstd', '.zstd': 'zstd'}
+chunk_size = 1 << 20
+queue_size = 16
+# член больше этого размера распаковывается потоково, а не целиком в памяти
+member_limit = 64 << 20
+
+
+class MemberTooLarge(Exception):
+	"""Распакованный член файла превысил member_limit
+	"""
+
+
+class Stopped(Exception):
+	"""Чтение распакованного файла прекращено
+	"""
+
+
+def detect_compression(file_name: str) -> str:
+	"""Определяет формат сжатия файла по первым байтам, а если они не подходят — по расширению
+
+	Args:
+		file_name (str): Название файла
+
+	Returns:
+		str or None: 'gzip', 'bz2', 'xz', 'zstd' или None для несжатого файла
+	"""
+	with open(file_name, 'rb') as file:
+		head = file.read(6)
+	for compression, magic in magic_numbers.items():
+		if head.startswith(magic):
+			return compression
+	return extensions.get(os.path.splitext(file_name)[1].lower())
+
+def new_decompressor(compression: str):
+	"""Создает распаковщик одного члена файла
+
+	Args:
+		compression (str): Формат сжатия
+
+	Returns:
+		Any: Объект с методом decompress и атрибутами eof и unused_data
+	"""
+	if compression == 'gzip':
+		import zlib
+		return zlib.decompressobj(31)
+	if compression == 'bz2':
+		import bz2
+		return bz2.BZ2Decompressor()
+	if compression == 'xz':
+		import lzma
+		return lzma.LZMADecompressor()
+	try:
+		import zstandard
+	except ImportError:
+		raise ImportError('Для чтения .zst файлов нужен пакет zstandard (pip install zstandard)')
+	return zstandard.ZstdDecompressor().decompressobj()
+
+def skip_padding(data, position: int) -> int:
+	"""Пропускает нулевые байты, которыми gzip и xz разрешают дополнять файл между членами
+
+	Args:
+		data (mmap.mmap): Сжатый файл
+		position (int): Позиция после конца члена
+
+	Returns:
+		int: Позиция начала следующего члена
+	"""
+	while position < len(data) and data[position] == 0:
+		position += 1
+	return position
+
+def decompress_member(data, start: int, compression: str):
+	"""Распаковывает один член файла целиком (выполняется в пуле потоков)
+
+	Args:
+		data (mmap.mmap): Сжатый файл
+		start (int): Позиция начала члена
+		compression (str): Формат сжатия
+
+	Returns:
+		Tuple[bytes, int]: Распакованные данные и позиция конца члена
+	"""
+	decompressor = new_decompressor(compression)
+	output, size, position = [], 0, start
+	while not decompressor.eof:
+		if position >= len(data):
+			raise EOFError('Сжатый файл обрезан')
+		chunk = data[position:position + chunk_size]
+		position += len(chunk)
+		output.append(decompressor.decompress(chunk))
+		size += len(output[-1])
+		if size > member_limit and not decompressor.eof:
+			raise MemberTooLarge()
+
+	return b''.join(output), position - len(decompressor.unused_data)
+
+
+class DecompressedReader(io.RawIOBase):
+	"""Поток распакованных байтов сжатого файла.
+
+	Распаковка выполняется в отдельном потоке и передается читателю через ограниченную очередь,
+	поэтому она идет одновременно с разбором csv. Файлы из нескольких членов (pbzip2, pixz, bgzip,
+	многокадровый zstd) распаковываются параллельно пулом потоков: zlib, bz2, lzma и zstandard
+	отпускают GIL во время распаковки.
+
+	Attributes:
+		file_name (str): Название файла
+		compression (str): Формат сжатия
+		workers (int): Количество потоков распаковки
+	"""
+	def __init__(self, file_name: str, compression: str, workers: int = None):
+		"""Конструктор класса. Запускает поток распаковки
+
+		Args:
+			file_name (str): Название файла
+			compression (str): Формат сжатия
+			workers (int): Количество потоков распаковки (по умолчанию — число ядер)
+		"""
+		super().__init__()
+		self.file_name = file_name
+		self.compression = compression
+		self.workers = workers or os.cpu_count() or 1
+		self.queue = queue.Queue(queue_size)
+		self.stop = threading.Event()
+		self.view = memoryview(b'')
+		self.done = False
+		self.thread = threading.Thread(target=self.__produce, daemon=True)
+		self.thread.start()
+
+	def readable(self):
+		return True
+
+	def readinto(self, buffer) -> int:
+		"""Копирует в buffer следующую порцию распакованных данных
+
+		Returns:
+			int: Количество скопированных байтов (0 — конец файла)
+		"""
+		while not self.view and not self.done:
+			item = self.queue.get()
+			if item is None:
+				self.done = True
+			elif isinstance(item, BaseException):
+				self.done = True
+				raise item
+			else:
+				self.view = memoryview(item)
+
+		size = min(len(buffer), len(self.view))
+		buffer[:size] = self.view[:size]
+		self.view = self.view[size:]
+		return size
+
+	def close(self):
+		"""Останавливает поток распаковки и закрывает поток
+		"""
+		self.stop.set()
+		while self.thread.is_alive():
+			try:
+				self.queue.get(timeout=0.1)
+			except queue.Empty:
+				pass
+		super().close()
+
+	def __put(self, item):
+		"""Приватный метод передачи данных читателю; ждет, пока в очереди освободится место
+
+		Args:
+			item (bytes or BaseException or None): Распакованные данные, ошибка или признак конца файла
+		"""
+		while not self.stop.is_set():
+			try:
+				return self.queue.put(item, timeout=0.1)
+			except queue.Full:
+				pass
+		raise Stopped()
+
+	def __produce(self):
+		"""Приватный метод потока распаковки
+		"""
+		import mmap
+
+		try:
+			with open(self.file_name, 'rb') as file:
+				if os.fstat(file.fileno()).st_size == 0:
+					return self.__put(None)
+				with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+					members = [match.start() for match in member_patterns[self.compression].finditer(data)] if self.workers > 1 else []
+					if len(members) > 1 and members[0] == 0:
+						self.__decompress_parallel(data, members)
+					else:
+						self.__decompress_stream(data, 0)
+			self.__put(None)
+		except Stopped:
+			pass
+		except BaseException as error:
+			try:
+				self.__put(error)
+			except Stopped:
+				pass
+
+	def __decompress_stream(self, data, position: int):
+		"""Приватный метод последовательной потоковой распаковки с позиции position до конца файла
+
+		Args:
+			data (mmap.mmap): Сжатый файл
+			position (int): Позиция начала члена
+		"""
+		decompressor, started = new_decompressor(self.compression), False
+		while position < len(data):
+			chunk = data[position:position + chunk_size]
+			position += len(chunk)
+			while chunk:
+				output = decompressor.decompress(chunk)
+				if output:
+					self.__put(output)
+				started = True
+				chunk = b''
+				if decompressor.eof:
+					# остаток порции — начало следующего члена
+					chunk = decompressor.unused_data.lstrip(b'\x00')
+					decompressor, started = new_decompressor(self.compression), False
+					if not chunk:
+						position = skip_padding(data, position)
+		if started and not decompressor.eof:
+			raise EOFError('Сжатый файл обрезан')
+
+	def __decompress_parallel(self, data, members: list):
+		"""Приватный метод параллельной распаковки членов файла. Найденные сигнатуры могут оказаться
+		случайными совпадениями внутри сжатых данных, поэтому в результат идут только члены,
+		начинающиеся ровно там, где закончился предыдущий
+
+		Args:
+			data (mmap.mmap): Сжатый файл
+			members (list): Позиции найденных сигнатур начала члена
+		"""
+		from concurrent.futures import ThreadPoolExecutor
+
+		pool = ThreadPoolExecutor(self.workers)
+		futures, index, position = {}, 0, 0
+		try:
+			while position < len(data):
+				while index < len(members) and len(futures) < self.workers * 2:
+					if members[index] >= position:
+						futures[members[index]] = pool.submit(decompress_member, data, members[index], self.compression)
+					index += 1
+
+				future = futures.pop(position, None) or pool.submit(decompress_member, data, position, self.compression)
+				try:
+					member, end = future.result()
+				except MemberTooLarge:
+					return self.__decompress_stream(data, position)
+				self.__put(member)
+
+				position = skip_padding(data, end)
+				for stale in [start for start in futures if start < position]:
+					futures.pop(stale).cancel()
+		finally:
+			pool.shutdown(cancel_futures=True)
+
+
+def open_binary(file_name: str, workers: int = None):
+	"""Открывает файл для чтения байтов, прозрачно распаковывая gzip, bz2, xz и zstd
+
+	Args:
+		file_name (str): Название файла
+		workers (int): Количество потоков распаковки
+
+	Returns:
+		BinaryIO: Файловый объект
+	"""
+	compression = detect_compression(file_name)
+	if compression is None:
+		return open(file_name, 'rb')
+	return io.BufferedReader(DecompressedReader(file_name, compression, workers), chunk_size)
+
+def open_text(file_name: str, workers: int = None):
+	"""Открывает csv-файл в кодировке utf-8 для чтения, прозрачно распаковывая gzip, bz2, xz и zstd
+
+	Args:
+		file_name (str): Название файла
+		workers (int): Количество потоков распаковки
+
+	Returns:
+		TextIO: Файловый объект
+	"""
+	if detect_compression(file_name) is None:
+		return open(file_name, 'r', encoding='utf-8', newline='')
+	return io.TextIOWrapper(open_binary(file_name, workers), encoding='utf-8', newline='')
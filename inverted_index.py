@@ -0,0 +1,182 @@
+import base64
+import re
+from typing import Iterable, List
+
+# навыки вроде C++, C#, Node.js и 1C-Битрикс должны оставаться одним токеном
+token_pattern = re.compile(r'[\w+#]+(?:[.\-][\w+#]+)*')
+
+
+def tokenize(text: str) -> List[str]:
+	"""Разбивает текст на токены в нижнем регистре
+
+	Args:
+		text (str): Текст
+
+	Returns:
+		List[str]: Токены
+
+	>>> tokenize('Python, C++ и Node.js.')
+	['python', 'c++', 'и', 'node.js']
+	"""
+	return token_pattern.findall(text.lower())
+
+def parse_query(query: str) -> List[List[str]]:
+	"""Разбирает запрос навыков: '|' разделяет альтернативы, '&' — навыки, которые должны быть все.
+	Навык из нескольких слов требует наличия каждого слова
+
+	Args:
+		query (str): Запрос, например 'Python & Django | Go'
+
+	Returns:
+		List[List[str]]: Альтернативы, каждая — список обязательных токенов
+
+	>>> parse_query('Python & Machine Learning | Go')
+	[['python', 'machine', 'learning'], ['go']]
+	"""
+	groups = [[token for skill in group.split('&') for token in tokenize(skill)] for group in query.split('|')]
+	return [group for group in groups if group]
+
+def match_query(groups: List[List[str]], tokens: set) -> bool:
+	"""Проверяет, подходит ли набор токенов одной вакансии под разобранный запрос
+
+	Args:
+		groups (List[List[str]]): Разобранный запрос
+		tokens (set): Токены вакансии
+
+	Returns:
+		bool: Подходит ли вакансия
+	"""
+	return any(all(token in tokens for token in group) for group in groups)
+
+def encode_ids(ids: Iterable[int], last: int = -1) -> bytes:
+	"""Сжимает возрастающие номера строк: хранятся разности соседних номеров в формате varint
+
+	Args:
+		ids (Iterable[int]): Возрастающие номера строк
+		last (int): Номер, после которого начинается список
+
+	Returns:
+		bytes: Сжатый список
+
+	>>> encode_ids([3, 5, 300])
+	b'\\x04\\x02\\xa7\\x02'
+	"""
+	output = bytearray()
+	for row_id in ids:
+		delta, last = row_id - last, row_id
+		while delta > 0x7f:
+			output.append(delta & 0x7f | 0x80)
+			delta >>= 7
+		output.append(delta)
+	return bytes(output)
+
+def decode_ids(data: bytes) -> List[int]:
+	"""Распаковывает список номеров строк, сжатый encode_ids
+
+	Args:
+		data (bytes): Сжатый список
+
+	Returns:
+		List[int]: Номера строк
+
+	>>> decode_ids(encode_ids([3, 5, 300]))
+	[3, 5, 300]
+	"""
+	ids, last, delta, shift = [], -1, 0, 0
+	for byte in data:
+		delta |= (byte & 0x7f) << shift
+		if byte & 0x80:
+			shift += 7
+			continue
+		last += delta
+		ids.append(last)
+		delta, shift = 0, 0
+	return ids
+
+
+class InvertedIndex:
+	"""Инвертированный индекс: для каждого токена хранится сжатый список номеров строк, в которых он встречается.
+
+	Attributes:
+		rows (int): Количество проиндексированных строк
+		postings (dict): Сжатые списки номеров строк по токенам
+	"""
+	def __init__(self):
+		"""Конструктор класса
+		"""
+		self.rows = 0
+		self.postings = {}
+		self.__last = {}
+
+	def add(self, row_id: int, text: str):
+		"""Добавляет строку в индекс. Номера строк должны добавляться по возрастанию
+
+		Args:
+			row_id (int): Номер строки
+			text (str): Текст строки
+		"""
+		for token in set(tokenize(text)):
+			self.postings.setdefault(token, bytearray()).extend(encode_ids([row_id], self.__last.get(token, -1)))
+			self.__last[token] = row_id
+		self.rows = max(self.rows, row_id + 1)
+
+	def get(self, token: str) -> List[int]:
+		"""Возвращает номера строк, в которых встречается токен
+
+		Args:
+			token (str): Токен в нижнем регистре
+
+		Returns:
+			List[int]: Номера строк по возрастанию
+		"""
+		return decode_ids(self.postings.get(token, b''))
+
+	def search(self, query: str) -> List[int]:
+		"""Находит строки, подходящие под запрос навыков (см. parse_query)
+
+		Args:
+			query (str): Запрос, например 'Python & Django | Go'
+
+		Returns:
+			List[int]: Номера строк по возрастанию
+
+		>>> index = InvertedIndex()
+		>>> for row_id, text in enumerate(['Python\\nDjango', 'Go\\nKubernetes', 'Python\\nKubernetes']):
+		...     index.add(row_id, text)
+		>>> index.search('Python & Kubernetes'), index.search('django | go'), index.search('Java')
+		([2], [0, 1], [])
+		"""
+		found = set()
+		for group in parse_query(query):
+			# пересечение начинается с самого короткого списка
+			postings = sorted((self.postings.get(token, b'') for token in group), key=len)
+			ids = set(decode_ids(postings[0]))
+			for data in postings[1:]:
+				if not ids:
+					break
+				ids.intersection_update(decode_ids(data))
+			found.update(ids)
+		return sorted(found)
+
+	def to_dict(self) -> dict:
+		"""Возвращает индекс в виде словаря для сохранения в json
+
+		Returns:
+			dict: Количество строк и списки номеров строк в base64
+		"""
+		return {'rows': self.rows, 'postings': {token: base64.b64encode(data).decode('ascii') for token, data in self.postings.items()}}
+
+	@classmethod
+	def from_dict(cls, data: dict) -> 'InvertedIndex':
+		"""Восстанавливает индекс из словаря to_dict
+
+		Args:
+			data (dict): Словарь, полученный to_dict
+
+		Returns:
+			InvertedIndex: Индекс
+		"""
+		index = cls()
+		index.rows = data['rows']
+		index.postings = {token: base64.b64decode(postings) for token, postings in data['postings'].items()}
+		return index
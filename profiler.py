@@ -0,0 +1,172 @@
+import atexit
+import os
+from functools import wraps
+from time import perf_counter_ns
+
+
+class Timer:
+	"""Таймер участка кода, используемый как декоратор или контекстный менеджер.
+
+	Attributes:
+		profiler (Profiler): Реестр, в который записывается время
+		name (str): Название таймера
+	"""
+	def __init__(self, profiler: 'Profiler', name: str):
+		"""Конструктор класса
+
+		Args:
+			profiler (Profiler): Реестр, в который записывается время
+			name (str): Название таймера
+		"""
+		self.profiler = profiler
+		self.name = name
+		self.start = 0
+
+	def __enter__(self):
+		self.start = perf_counter_ns()
+		return self
+
+	def __exit__(self, *exc_info):
+		self.profiler.add_time(self.name, perf_counter_ns() - self.start)
+
+	def __call__(self, func):
+		"""Оборачивает функцию, сохраняя ее возвращаемое значение
+
+		Args:
+			func (Callable): Функция, время выполнения которой нужно замерять
+
+		Returns:
+			Callable: Обернутая функция
+		"""
+		profiler, name = self.profiler, self.name
+
+		@wraps(func)
+		def wrapper(*args, **kwargs):
+			start = perf_counter_ns()
+			try:
+				return func(*args, **kwargs)
+			finally:
+				profiler.add_time(name, perf_counter_ns() - start)
+
+		return wrapper
+
+
+class DisabledTimer:
+	"""Таймер выключенного реестра: ничего не замеряет и возвращает функции без обертки
+	"""
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc_info):
+		pass
+
+	def __call__(self, func):
+		return func
+
+
+class Profiler:
+	"""Реестр таймеров и счетчиков горячих участков кода.
+
+	Выключенный реестр почти не влияет на скорость: декораторы возвращают исходные функции,
+	а контекстные менеджеры и счетчики ничего не делают.
+
+	Attributes:
+		enabled (bool): Включены ли замеры
+		timers (dict): Количество вызовов и суммарное время в наносекундах для каждого таймера
+		counters (dict): Значения счетчиков
+	"""
+	def __init__(self, enabled: bool = False):
+		"""Конструктор класса
+
+		Args:
+			enabled (bool): Включены ли замеры
+		"""
+		self.enabled = enabled
+		self.timers = {}
+		self.counters = {}
+
+	def timer(self, name: str):
+		"""Возвращает таймер для декоратора или блока with
+
+		Args:
+			name (str): Название таймера
+
+		Returns:
+			Timer or DisabledTimer: Таймер
+
+		>>> profiler = Profiler(enabled=True)
+		>>> with profiler.timer('parsing'):
+		...     pass
+		>>> profiler.timer('formatting')(lambda value: value * 2)(21)
+		42
+		>>> sorted(profiler.timers), profiler.timers['formatting'][0]
+		(['formatting', 'parsing'], 1)
+		"""
+		return Timer(self, name) if self.enabled else disabled_timer
+
+	def add_time(self, name: str, nanoseconds: int):
+		"""Добавляет время к таймеру
+
+		Args:
+			name (str): Название таймера
+			nanoseconds (int): Время в наносекундах
+		"""
+		calls, total = self.timers.get(name, (0, 0))
+		self.timers[name] = (calls + 1, total + nanoseconds)
+
+	def count(self, name: str, value: int = 1):
+		"""Увеличивает счетчик
+
+		Args:
+			name (str): Название счетчика
+			value (int): Значение, на которое нужно увеличить счетчик
+		"""
+		if self.enabled:
+			self.counters[name] = self.counters.get(name, 0) + value
+
+	def print_report(self):
+		"""Выводит на экран время выполнения по каждому таймеру и значения счетчиков
+		"""
+		for name, (calls, total) in self.timers.items():
+			print(f'Время выполнения \'{name}\': {total / 1e9} ({calls} вызовов)')
+		for name, value in self.counters.items():
+			print(f'{name}: {value}')
+
+	def dump(self, file_name: str):
+		"""Сохраняет результаты замеров в json- или csv-файл (по расширению).
+		{pid} в названии файла заменяется на номер процесса
+
+		Args:
+			file_name (str): Название файла
+		"""
+		file_name = file_name.replace('{pid}', str(os.getpid()))
+		timers = {name: {'calls': calls, 'total_ms': total / 1e6, 'mean_us': total / calls / 1e3} for name, (calls, total) in self.timers.items()}
+
+		with open(file_name, 'w', encoding='utf-8', newline='') as file:
+			if file_name.endswith('.csv'):
+				import csv
+				writer = csv.writer(file)
+				writer.writerow(['kind', 'name', 'calls', 'total_ms', 'mean_us', 'value'])
+				writer.writerows(['timer', name, data['calls'], data['total_ms'], data['mean_us'], ''] for name, data in timers.items())
+				writer.writerows(['counter', name, '', '', '', value] for name, value in self.counters.items())
+			else:
+				import json
+				json.dump({'timers': timers, 'counters': self.counters}, file, indent=4, ensure_ascii=False)
+
+	def enable(self, file_name: str = None):
+		"""Включает замеры; если указан файл, результаты сохранятся в него при завершении программы.
+		Функции, обернутые до включения, не замеряются
+
+		Args:
+			file_name (str): Название json- или csv-файла для результатов
+		"""
+		self.enabled = True
+		if file_name:
+			atexit.register(self.dump, file_name)
+
+
+disabled_timer = DisabledTimer()
+# общий реестр; включается переменной окружения VACANCIES_PROFILE=profile.json (или .csv)
+profiler = Profiler()
+if os.environ.get('VACANCIES_PROFILE'):
+	profiler.enable(os.environ['VACANCIES_PROFILE'])
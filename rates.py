@@ -0,0 +1,161 @@
+import json
+import os
+from datetime import date
+from typing import Dict, Tuple
+
+import numpy as np
+
+# дневные курсы валют, которые сохраняет 331/currency_by_years.py: общий файл в корне репозитория, чтобы его находили 332 и 341
+rates_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'currency_rates.json')
+# прежние курсы на 1-е число каждого месяца (ищутся в папке запуска)
+monthly_rates_file = 'currency_by_years.json'
+# курс старше этого количества дней считается отсутствующим (валюта перестала котироваться)
+rate_max_age = 14
+# номер дня 1970-01-01, от которого отсчитывается datetime64[D]
+epoch_ordinal = date(1970, 1, 1).toordinal()
+
+
+def to_days(values) -> np.ndarray:
+	"""Приводит даты к массиву numpy с точностью до дня
+
+	Args:
+		values (Iterable): Строки вида '2022-07-05T18:19:30+0300', объекты datetime или datetime64
+
+	Returns:
+		np.ndarray: Массив datetime64[D]
+
+	>>> to_days(['2022-07-05T18:19:30+0300', '2003-01-24']).tolist()
+	[datetime.date(2022, 7, 5), datetime.date(2003, 1, 24)]
+	>>> from datetime import datetime
+	>>> to_days([datetime(2022, 7, 5, 23, 59), date(1969, 12, 31)]).tolist()
+	[datetime.date(2022, 7, 5), datetime.date(1969, 12, 31)]
+	"""
+	if isinstance(values, list) and values and isinstance(values[0], date):
+		# numpy переводит объекты datetime поэлементно и медленно, номер дня toordinal в разы быстрее
+		ordinals = np.fromiter((value.toordinal() for value in values), np.int64, len(values))
+		return (ordinals - epoch_ordinal).astype('datetime64[D]')
+	values = np.asarray(values)
+	if values.dtype.kind in 'OUS' and len(values) and isinstance(values.flat[0], str):
+		# строки обрезаются до даты без цикла на python
+		values = values.astype('U10')
+	return values.astype('datetime64[D]')
+
+
+class RateIndex:
+	"""Курсы валют к рублю по дням. Для каждой валюты хранятся два отсортированных массива numpy —
+	дни (datetime64[D]) и курсы (float64), а курс на любой день ищется np.searchsorted сразу для всей колонки дат
+	как курс последнего рабочего дня не позже этой даты
+
+	Attributes:
+		rates (dict): Массивы дней и курсов для каждой валюты
+		max_age (int): Через сколько дней после последнего курса валюта считается не котирующейся
+	"""
+	def __init__(self, rates: Dict[str, Tuple[np.ndarray, np.ndarray]], max_age: int = rate_max_age):
+		"""Конструктор класса
+
+		Args:
+			rates (dict): Массивы дней и курсов для каждой валюты (дни по возрастанию)
+			max_age (int): Через сколько дней после последнего курса валюта считается не котирующейся
+		"""
+		self.rates = rates
+		self.max_age = max_age
+
+	@classmethod
+	def from_daily(cls, cache: dict) -> 'RateIndex':
+		"""Создает индекс из кэша дневных курсов
+
+		Args:
+			cache (dict): Кэш 331/currency_by_years.py: для каждой валюты 'rates' — курсы по датам 'ГГГГ-ММ-ДД'
+
+		Returns:
+			RateIndex: Индекс курсов
+		"""
+		rates = {}
+		for currency, entry in cache.items():
+			dates = sorted(entry['rates'])
+			rates[currency] = (to_days(dates), np.array([entry['rates'][date] for date in dates], dtype=np.float64))
+		return cls(rates)
+
+	@classmethod
+	def from_monthly(cls, monthly: dict) -> 'RateIndex':
+		"""Создает индекс из курсов на 1-е число каждого месяца ({'ГГГГ-ММ': {валюта: курс}}).
+		Курс действует весь месяц; отсутствующий или нулевой курс хранится как nan, чтобы не брать курс прошлого месяца
+
+		Args:
+			monthly (dict): Курсы по месяцам
+
+		Returns:
+			RateIndex: Индекс курсов
+
+		>>> index = RateIndex.from_monthly({'2022-01': {'USD': 75.0}, '2022-02': {'USD': 77.0, 'EUR': 86.0}})
+		>>> index.lookup('USD', to_days(['2022-01-31', '2022-02-15'])).tolist(), index.lookup('EUR', to_days(['2022-01-15'])).tolist()
+		([75.0, 77.0], [nan])
+		"""
+		months = sorted(monthly)
+		currencies = sorted({currency for rates in monthly.values() for currency in rates})
+		days = to_days([f'{month}-01' for month in months])
+		rates = {currency: (days, np.array([monthly[month].get(currency) or np.nan for month in months], dtype=np.float64)) for currency in currencies}
+		return cls(rates, max_age=31)
+
+	def lookup(self, currency: str, days: np.ndarray) -> np.ndarray:
+		"""Находит курс валюты на каждый день массива: курс последнего дня индекса не позже этого дня
+
+		Args:
+			currency (str): Код валюты
+			days (np.ndarray): Дни (datetime64[D])
+
+		Returns:
+			np.ndarray: Курсы (nan, если курса нет)
+
+		>>> index = RateIndex({'USD': (to_days(['2022-01-10', '2022-01-11', '2022-01-14']), np.array([75.0, 74.5, 76.0]))})
+		>>> index.lookup('USD', to_days(['2022-01-09', '2022-01-11', '2022-01-13', '2022-01-16', '2022-03-01'])).tolist()
+		[nan, 74.5, 74.5, 76.0, nan]
+		"""
+		if currency not in self.rates or len(self.rates[currency][0]) == 0:
+			return np.full(len(days), np.nan)
+		dates, values = self.rates[currency]
+		positions = np.searchsorted(dates, days, side='right') - 1
+		found = positions >= 0
+		positions = np.maximum(positions, 0)
+		found &= (days - dates[positions]).astype(np.int64) <= self.max_age
+		return np.where(found, values[positions], np.nan)
+
+	def multipliers(self, currencies, days) -> np.ndarray:
+		"""Вычисляет множители перевода окладов в рубли для колонок валют и дат публикации.
+		Оклады в рублях и без валюты не переводятся (множитель 1), каждая валюта ищется одним вызовом lookup
+
+		Args:
+			currencies (Iterable): Коды валют (пустые значения и nan — без валюты)
+			days (Iterable): Даты публикации (см. to_days)
+
+		Returns:
+			np.ndarray: Множители (nan, если курса нет)
+
+		>>> index = RateIndex({'USD': (to_days(['2022-01-10']), np.array([75.0]))})
+		>>> index.multipliers(['USD', 'RUR', '', 'EUR'], ['2022-01-11T10:00:00+0300'] * 4).tolist()
+		[75.0, 1.0, 1.0, nan]
+		"""
+		currencies = np.asarray(currencies, dtype=object)
+		days = to_days(days)
+		result = np.ones(len(days))
+		for currency in {currency for currency in currencies if isinstance(currency, str) and currency not in ('', 'RUR')}:
+			mask = currencies == currency
+			result[mask] = self.lookup(currency, days[mask])
+		return result
+
+
+def load_rate_index(directory: str = '.', file_name: str = rates_file) -> RateIndex:
+	"""Загружает дневные курсы из file_name, а если их нет — курсы по месяцам из monthly_rates_file
+
+	Args:
+		directory (str): Папка с курсами по месяцам
+		file_name (str): Файл дневных курсов
+
+	Returns:
+		RateIndex: Индекс курсов
+	"""
+	if os.path.exists(file_name):
+		with open(file_name, 'r', encoding='utf-8') as file:
+			return RateIndex.from_daily(json.load(file))
+	with open(os.path.join(directory, monthly_rates_file), 'r', encoding='utf-8') as file:
+		return RateIndex.from_monthly(json.load(file))